@@ -0,0 +1,355 @@
+"""Benchmarks the generation of the client for synthetic APIs of increasing
+scale.
+
+    python benchmarks/run.py --scales 10 100 1000 5000 --output before.json
+    python benchmarks/run.py --compare before.json
+
+Each run generates the client in a fresh process, so that its peak memory and
+caches are its own, and reports the duration of each phase of the generation,
+the peak memory and the output size. The results are saved as JSON, along with
+the commit they were measured at.
+"""
+import argparse
+import datetime
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# the phases timed by `emit_typescript_bindings`, then the write of the file
+PHASES = (
+    "url_resolution",
+    "view_mapping",
+    "interface_building",
+    "rendering",
+    "writing",
+)
+
+
+def _get_max_rss_kb() -> int:
+    # kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _count_endpoints(mappings: dict) -> int:
+    return sum(
+        _count_endpoints(value) if isinstance(value, dict) else 1
+        for value in mappings.values()
+    )
+
+
+def _configure_django() -> None:
+    import django
+    from django.conf import settings
+
+    settings.configure(
+        SECRET_KEY="benchmark",
+        INSTALLED_APPS=[
+            "django.contrib.auth",
+            "django.contrib.contenttypes",
+            "rest_framework",
+        ],
+        USE_TZ=True,
+        DRF_TSDK={"GENERATION_MODE": "deferred", "USE_FINGERPRINT": False},
+    )
+    django.setup()
+
+
+def _read_output(output_path: str) -> str:
+    """Returns the text of the generated file, or of every generated module"""
+    paths = [output_path]
+    if os.path.isdir(output_path):
+        names = sorted(os.listdir(output_path))
+        paths = [os.path.join(output_path, name) for name in names]
+    ret = ""
+    for path in paths:
+        with open(path, encoding="utf-8") as output_file:
+            ret += output_file.read()
+    return ret
+
+
+def run_worker(options: dict) -> dict:
+    """Synthesizes the API described by `options` and generates its client
+    once, as `generate_api_client` does"""
+    sys.path.insert(0, REPO_DIR)
+    _configure_django()
+    logging.disable(logging.WARNING)
+
+    from synthetic import synthesize_api
+
+    from drf_tsdk.drf_to_ts import DRFSerializerMapper, DRFViewMapper
+    from drf_tsdk.generate_typescript_bindings import (
+        stream_typescript_bindings,
+        stream_typescript_modules,
+    )
+
+    start = time.perf_counter()
+    urlpatterns = synthesize_api(
+        options["serializers"],
+        depth=options["depth"],
+        actions=options["actions"],
+        serializers_per_viewset=options["serializers_per_viewset"],
+        include_depth=options["include_depth"],
+    )
+    synthesis = time.perf_counter() - start
+
+    if options["tracemalloc"]:
+        tracemalloc.start()
+    max_rss_before_kb = _get_max_rss_kb()
+    timings = {}
+    counters = {}
+    stream = (
+        stream_typescript_modules
+        if options["layout"] == "directory"
+        else stream_typescript_bindings
+    )
+    with tempfile.TemporaryDirectory() as output_dir:
+        output_path = os.path.join(output_dir, "api")
+        if options["layout"] == "file":
+            output_path += ".ts"
+        start = time.perf_counter()
+        stream(
+            output_path,
+            api_name="API",
+            headers={},
+            csrf_token_variable_name="csrftoken",
+            post_processor=None,
+            urlpatterns=urlpatterns,
+            timings=timings,
+            counters=counters,
+        )
+        total = time.perf_counter() - start
+        text = _read_output(output_path)
+    introspection_seconds = timings["serializer_introspection"]
+
+    ret = {
+        "synthesis_seconds": synthesis,
+        "phases_seconds": {phase: timings[phase] for phase in PHASES},
+        "serializer_introspection_seconds": introspection_seconds,
+        "counters": counters,
+        "total_seconds": total,
+        "max_rss_mb": _get_max_rss_kb() / 1024,
+        # how much generating raised the peak memory of the process
+        "generation_rss_mb": (_get_max_rss_kb() - max_rss_before_kb) / 1024,
+        "output_bytes": len(text.encode("utf-8")),
+        "output_lines": text.count("\n"),
+        "interfaces": len(DRFSerializerMapper.mappings),
+        "endpoints": _count_endpoints(DRFViewMapper.mappings),
+        "inline_type_aliases": text.count("\ntype _"),
+    }
+    if options["tracemalloc"]:
+        _, traced_peak = tracemalloc.get_traced_memory()
+        ret["traced_peak_mb"] = traced_peak / 1024 / 1024
+        tracemalloc.stop()
+    return ret
+
+
+def _run_in_subprocess(options: dict) -> dict:
+    script = os.path.abspath(__file__)
+    output = subprocess.run(
+        [sys.executable, script, "--worker", json.dumps(options)],
+        check=True,
+        stdout=subprocess.PIPE,
+        cwd=os.path.dirname(script),
+    ).stdout
+    return json.loads(output)
+
+
+def _median_of(runs: list) -> dict:
+    """Returns the median of each number of `runs`, which have the same keys"""
+    ret = {}
+    for key, value in runs[0].items():
+        if isinstance(value, dict):
+            ret[key] = _median_of([run[key] for run in runs])
+        else:
+            ret[key] = statistics.median(run[key] for run in runs)
+    return ret
+
+
+def _get_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=REPO_DIR,
+            universal_newlines=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _get_environment() -> dict:
+    import django
+
+    import rest_framework
+
+    return {
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "djangorestframework": rest_framework.VERSION,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(baseline: dict, results: dict, threshold: float) -> bool:
+    """Prints the ratio of each duration and size of `results` to `baseline`.
+    Returns `False` if the total time of a scale regressed by more than
+    `threshold`."""
+    ok = True
+    old_scales = {scale["serializers"]: scale for scale in baseline["scales"]}
+    print(f"Compared to {baseline['commit'][:12]}:")
+    for scale in results["scales"]:
+        old = old_scales.get(scale["serializers"])
+        if old is None:
+            continue
+        new_median, old_median = scale["median"], old["median"]
+        ratios = {
+            "total": new_median["total_seconds"] / old_median["total_seconds"],
+            **{
+                phase: new_median["phases_seconds"][phase]
+                / old_median["phases_seconds"][phase]
+                for phase in PHASES
+                # the baseline may predate a phase
+                if old_median["phases_seconds"].get(phase)
+            },
+            "max_rss": new_median["max_rss_mb"] / old_median["max_rss_mb"],
+            "output": new_median["output_bytes"] / old_median["output_bytes"],
+        }
+        print(
+            "  %5d serializers: " % scale["serializers"]
+            + ", ".join("%s x%.2f" % item for item in ratios.items())
+        )
+        if ratios["total"] > threshold:
+            ok = False
+    return ok
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--scales",
+        type=int,
+        nargs="+",
+        default=[10, 100, 1000, 5000],
+        help="The numbers of serializers to benchmark",
+    )
+    parser.add_argument(
+        "--depth",
+        type=int,
+        default=3,
+        help="The nesting depth of the serializers",
+    )
+    parser.add_argument(
+        "--actions",
+        type=int,
+        default=8,
+        help="The number of endpoints per ViewSet",
+    )
+    parser.add_argument("--serializers-per-viewset", type=int, default=4)
+    parser.add_argument(
+        "--layout",
+        choices=("file", "directory"),
+        default="file",
+        help="Whether to generate a single file or a module per namespace",
+    )
+    parser.add_argument(
+        "--include-depth",
+        type=int,
+        default=4,
+        help="The number of nested include()s above each namespace",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="The number of runs per scale, of which the median is reported",
+    )
+    parser.add_argument(
+        "--tracemalloc",
+        action="store_true",
+        help="Also report the peak memory traced by tracemalloc, which slows "
+        "generation down",
+    )
+    parser.add_argument("--output", help="Defaults to benchmark-<commit>.json")
+    parser.add_argument(
+        "--compare", help="The results of a previous run to compare with"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="With --compare, fail if the total time of a scale grew by more "
+        "than this factor",
+    )
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        json.dump(run_worker(json.loads(args.worker)), sys.stdout)
+        return 0
+
+    commit = _get_commit()
+    results = {
+        "commit": commit,
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "environment": _get_environment(),
+        "options": {
+            "depth": args.depth,
+            "actions": args.actions,
+            "serializers_per_viewset": args.serializers_per_viewset,
+            "include_depth": args.include_depth,
+            "repeat": args.repeat,
+            "tracemalloc": args.tracemalloc,
+            "layout": args.layout,
+        },
+        "scales": [],
+    }
+    for scale in args.scales:
+        options = dict(results["options"], serializers=scale)
+        runs = [_run_in_subprocess(options) for _ in range(args.repeat)]
+        median = _median_of(runs)
+        results["scales"].append(
+            {"serializers": scale, "median": median, "runs": runs},
+        )
+        print(
+            "%5d serializers, %5d endpoints: %7.3fs (%s), "
+            "%6.1f MB peak, %9d bytes"
+            % (
+                scale,
+                median["endpoints"],
+                median["total_seconds"],
+                ", ".join(
+                    f"{phase} {median['phases_seconds'][phase]:.3f}s"
+                    for phase in PHASES
+                ),
+                median["max_rss_mb"],
+                median["output_bytes"],
+            )
+        )
+
+    output = args.output or f"benchmark-{commit[:12]}.json"
+    with open(output, "w") as output_file:
+        json.dump(results, output_file, indent=2)
+    print(f"Saved the results to {output}")
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            if not compare(json.load(baseline_file), results, args.threshold):
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""Builds a synthetic API, i.e. serializers, ViewSets decorated with
+`@ts_api_endpoint` and their URL patterns, at a given scale. Requires Django to
+be configured."""
+import math
+from typing import List
+
+from django.http import HttpResponse
+from django.urls import include, path, re_path
+
+from rest_framework import serializers, viewsets
+from rest_framework.decorators import action
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.routers import SimpleRouter
+
+from drf_tsdk import ts_api_endpoint, ts_api_interface
+
+MODULE = "benchmark_api"
+
+# the actions of each ViewSet, in order; any more are extra `@action`s
+_STANDARD_ACTIONS = (
+    # (name, method, detail, has a body, has a query, returns a list)
+    ("list", "GET", False, False, True, True),
+    ("create", "POST", False, True, False, False),
+    ("retrieve", "GET", True, False, False, False),
+    ("update", "PUT", True, True, False, False),
+    ("partial_update", "PATCH", True, True, False, False),
+    ("destroy", "DELETE", True, False, False, False),
+)
+
+
+def _named(name: str, attrs: dict) -> dict:
+    return {"__module__": MODULE, "__qualname__": name, **attrs}
+
+
+def _make_serializers(count: int, depth: int) -> List[type]:
+    """Returns `count` serializers. The serializer `i` is at level `i % depth`,
+    and those above level 0 nest the last serializer of the level below, once,
+    as a list and in a dict, so that the deepest ones are `depth` levels deep.
+    Every other serializer is an interface; the others are inlined."""
+    ret = []
+    last_of_level = {}
+    for i in range(count):
+        level = i % depth
+        fields = {
+            "name": serializers.CharField(help_text=f"The name of model {i}"),
+            "count": serializers.IntegerField(allow_null=True),
+            "price": serializers.DecimalField(max_digits=10, decimal_places=2),
+            "is_active": serializers.BooleanField(required=False),
+            "created_at": serializers.DateTimeField(read_only=True),
+            "status": serializers.ChoiceField(
+                choices=("draft", "live", "archived"),
+            ),
+            "tags": serializers.ListField(child=serializers.CharField()),
+            "scores": serializers.DictField(child=serializers.IntegerField()),
+        }
+        child = last_of_level.get(level - 1)
+        if child is not None:
+            fields["child"] = child(required=False)
+            fields["children"] = child(many=True, read_only=True)
+            fields["children_by_name"] = serializers.DictField(child=child())
+        name = f"Model{i}Serializer"
+        serializer = type(
+            name,
+            (serializers.Serializer,),
+            _named(name, fields),
+        )
+        if i % 2 == 0:
+            serializer = ts_api_interface(name=f"IModel{i}")(serializer)
+        last_of_level[level] = serializer
+        ret.append(serializer)
+    return ret
+
+
+def _make_handler(viewset_name: str, name: str):
+    def handler(self, request, *args, **kwargs):
+        return HttpResponse()
+
+    handler.__name__ = name
+    handler.__qualname__ = f"{viewset_name}.{name}"
+    handler.__module__ = MODULE
+    return handler
+
+
+def _make_viewset(index: int, namespace: str, serializer, actions: int, query):
+    name = f"Model{index}ViewSet"
+    attrs = {"pagination_class": PageNumberPagination}
+    for i in range(actions):
+        action_name, method, detail, has_body, has_query, many = (
+            _STANDARD_ACTIONS[i]
+            if i < len(_STANDARD_ACTIONS)
+            else (f"action{i}", "GET", True, False, False, False)
+        )
+        handler = ts_api_endpoint(
+            path=(namespace, f"model{index}", action_name),
+            method=method,
+            description=f"{action_name} of model {index}",
+            query_serializer=query if has_query else None,
+            body_serializer=serializer if has_body else None,
+            response_serializer=serializer(many=True) if many else serializer,
+            provides=[f"Model{index}"] if method == "GET" else None,
+            invalidates=[f"Model{index}"] if method != "GET" else None,
+            paginated=many,
+        )(_make_handler(name, action_name))
+        if i >= len(_STANDARD_ACTIONS):
+            handler = action(detail=detail, methods=[method.lower()])(handler)
+        attrs[action_name] = handler
+    return type(name, (viewsets.ViewSet,), _named(name, attrs))
+
+
+def _noop(request):
+    return HttpResponse()
+
+
+def _nest(urlpatterns: list, level: int, include_depth: int) -> list:
+    """Wraps `urlpatterns` in `include_depth - level` nested `include()`s,
+    alternating route and regex prefixes, next to a view which is not decorated
+    at every level"""
+    if level == include_depth:
+        return urlpatterns
+    nested = _nest(urlpatterns, level + 1, include_depth)
+    if level % 2 == 0:
+        prefix = path(f"l{level}/", include(nested))
+    else:
+        prefix = re_path(rf"^r{level}/", include(nested))
+    return [prefix, path(f"l{level}/health", _noop)]
+
+
+def synthesize_api(
+    serializers_count: int,
+    depth: int = 3,
+    actions: int = 8,
+    serializers_per_viewset: int = 4,
+    viewsets_per_namespace: int = 25,
+    include_depth: int = 4,
+) -> list:
+    """Declares a synthetic API and returns its URL patterns.
+
+    :param int serializers_count: The number of serializers, e.g. 1000
+    :param int depth: The nesting depth of the serializers
+    :param int actions: The number of endpoints of each ViewSet
+    :param int serializers_per_viewset: The serializers per ViewSet
+    :param int viewsets_per_namespace: The ViewSets per top-level namespace
+    :param int include_depth: The nested `include()`s above each namespace
+    """
+    model_serializers = _make_serializers(serializers_count, max(depth, 1))
+    query = type(
+        "ModelQuerySerializer",
+        (serializers.Serializer,),
+        _named(
+            "ModelQuerySerializer",
+            {
+                "search": serializers.CharField(required=False),
+                "ordering": serializers.ChoiceField(
+                    choices=("name", "-name"), required=False
+                ),
+            },
+        ),
+    )
+    query = ts_api_interface(name="IModelQuery")(query)
+
+    viewset_count = max(
+        1,
+        math.ceil(serializers_count / serializers_per_viewset),
+    )
+    urlpatterns = []
+    for start in range(0, viewset_count, viewsets_per_namespace):
+        namespace = f"ns{start // viewsets_per_namespace}"
+        router = SimpleRouter()
+        end = min(start + viewsets_per_namespace, viewset_count)
+        for index in range(start, end):
+            viewset = _make_viewset(
+                index,
+                namespace,
+                # alternates between interfaces and inlined serializers
+                model_serializers[
+                    (index * serializers_per_viewset + index % 2)
+                    % len(model_serializers)
+                ],
+                actions,
+                query,
+            )
+            router.register(f"model{index}", viewset, basename=f"model{index}")
+        nested = _nest(router.urls, 0, include_depth)
+        urlpatterns.append(path(f"{namespace}/", include(nested)))
+    return [path("api/", include(urlpatterns))]
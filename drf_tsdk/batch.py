@@ -0,0 +1,168 @@
+import copy
+import io
+import json
+import logging
+from urllib.parse import urlencode
+
+from django.http import QueryDict
+from django.urls import Resolver404, resolve
+
+from rest_framework import serializers
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .drf_to_ts import DRFViewMapper
+from .route_index import DecoratedViews
+
+_logger = logging.getLogger(f"drf-tsdk.{__name__}")
+
+# the headers of a sub-request which are not passed on to its view, which gets the batch request's
+_IGNORED_HEADERS = ("Content-Type", "Content-Length", "Cookie", "Host")
+# the headers of a sub-response which are returned to the client
+_RETURNED_HEADERS = ("ETag", "Last-Modified", "Cache-Control")
+
+
+class BatchSubRequestSerializer(serializers.Serializer):
+    path = serializers.CharField()
+    method = serializers.ChoiceField(
+        choices=("GET", "POST", "PUT", "PATCH", "DELETE"), default="GET"
+    )
+    query = serializers.DictField(required=False)
+    body = serializers.JSONField(required=False)
+    headers = serializers.DictField(child=serializers.CharField(), required=False)
+
+
+class BatchView(APIView):
+    """Runs a list of `{path, method, query, body, headers}` sub-requests in a single round-trip, in
+    order, and returns the `{status, headers, body}` of each. Sub-requests are dispatched in-process
+    to the views decorated with `@ts_api_endpoint`, as the user of the batch request; any other path
+    is a 404, and a view raising an exception is a 500. Each sub-request has the headers of the
+    batch request, overridden by its own `headers`. Its `path` may include the `SCRIPT_NAME` the
+    application is served under.
+
+    The generated client sends its requests here when `generate_typescript_bindings` is passed the
+    URL of this view as `batch_url`.
+
+    urlpatterns = [
+        path("api/batch", BatchView.as_view()),
+    ]
+    """
+
+    # keep this in sync with the `batch_max_requests` passed to `generate_typescript_bindings`
+    max_requests = 50
+
+    def post(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            raise serializers.ValidationError("Expected a list of sub-requests.")
+        if len(request.data) > self.max_requests:
+            raise serializers.ValidationError(
+                f"A batch may contain at most {self.max_requests} sub-requests."
+            )
+        serializer = BatchSubRequestSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        decorated_views = DecoratedViews(
+            view_mapper.view for view_mapper in DRFViewMapper.mappers
+        )
+        return Response(
+            [
+                self._dispatch(request, sub_request, decorated_views)
+                for sub_request in serializer.validated_data
+            ]
+        )
+
+    def _get_path_info(self, request, path: str) -> str:
+        """Returns `path` without the `SCRIPT_NAME` of `request`, as Django resolves it"""
+        script_name = request.META.get("SCRIPT_NAME", "").rstrip("/")
+        if script_name and (path == script_name or path.startswith(script_name + "/")):
+            return path[len(script_name) :] or "/"
+        return path
+
+    def _dispatch(self, request, sub_request: dict, decorated_views) -> dict:
+        path = sub_request["path"]
+        try:
+            match = resolve(
+                self._get_path_info(request, path), getattr(request, "urlconf", None)
+            )
+        except Resolver404:
+            match = None
+        if match is None or match.func not in decorated_views:
+            return {"status": 404, "headers": {}, "body": {"detail": "Not found."}}
+
+        _logger.debug("Dispatching %s %s", sub_request["method"], path)
+        try:
+            response = match.func(
+                self._get_sub_request(request, sub_request),
+                *match.args,
+                **match.kwargs,
+            )
+            body = self._get_body(response)
+        except Exception:
+            # the views handle API exceptions themselves; any other one fails this sub-request
+            # only, rather than the whole batch
+            _logger.exception("Error dispatching %s %s", sub_request["method"], path)
+            return {
+                "status": 500,
+                "headers": {},
+                "body": {"detail": APIException.default_detail},
+            }
+        return {
+            "status": response.status_code,
+            "headers": {
+                header: response[header]
+                for header in _RETURNED_HEADERS
+                if response.has_header(header)
+            },
+            "body": body,
+        }
+
+    def _get_sub_request(self, request, sub_request: dict):
+        """Returns a copy of the underlying `HttpRequest` of `request` for `sub_request`, which keeps
+        its user, session, cookies and headers"""
+        query_string = urlencode(sub_request.get("query", {}), doseq=True)
+        data = b""
+        if "body" in sub_request:
+            data = json.dumps(sub_request["body"]).encode("utf-8")
+
+        http_request = copy.copy(request._request)
+        for attr in ("GET", "_post", "_files", "_body", "headers", "resolver_match"):
+            http_request.__dict__.pop(attr, None)
+        path_info = self._get_path_info(request, sub_request["path"])
+        http_request.method = sub_request["method"]
+        http_request.path = sub_request["path"]
+        http_request.path_info = path_info
+        http_request.META = {
+            **request._request.META,
+            "REQUEST_METHOD": sub_request["method"],
+            "PATH_INFO": path_info,
+            "QUERY_STRING": query_string,
+            "CONTENT_TYPE": "application/json",
+            "CONTENT_LENGTH": str(len(data)),
+        }
+        for header, value in sub_request.get("headers", {}).items():
+            if header.title() not in _IGNORED_HEADERS:
+                http_request.META["HTTP_" + header.upper().replace("-", "_")] = value
+        http_request.environ = http_request.META
+        http_request.GET = QueryDict(query_string)
+        http_request.content_type = "application/json"
+        http_request.content_params = {}
+        http_request._stream = io.BytesIO(data)
+        http_request._read_started = False
+        return http_request
+
+    def _get_body(self, response):
+        if isinstance(response, Response):
+            # rendered once, along with the batch response
+            return response.data
+        if response.streaming:
+            # e.g. a `StreamingSerializerResponse`, returned as text
+            return b"".join(response.streaming_content).decode(
+                response.charset or "utf-8"
+            )
+        if not response.content:
+            return None
+        try:
+            return json.loads(response.content)
+        except ValueError:
+            return response.content.decode(response.charset or "utf-8")
@@ -25,6 +25,15 @@ class DRFViewMapper:
         query_serializer=None,
         body_serializer=None,
         response_serializer=None,
+        cache_ttl=None,
+        deduplicate=None,
+        provides=None,
+        invalidates=None,
+        stale_while_revalidate=False,
+        latest_wins=False,
+        retry=None,
+        stream=None,
+        paginated=False,
     ):
         self.path = path
         self.view = view
@@ -32,11 +41,20 @@ class DRFViewMapper:
         self.query_serializer = query_serializer
         self.body_serializer = body_serializer
         self.response_serializer = response_serializer
+        self.cache_ttl = cache_ttl
+        self.deduplicate = deduplicate
+        self.provides = provides
+        self.invalidates = invalidates
+        self.stale_while_revalidate = stale_while_revalidate
+        self.latest_wins = latest_wins
+        self.retry = retry
+        self.stream = stream
+        self.paginated = paginated
 
         DRFViewMapper.mappers.append(self)
 
     def _update_mappings_for_path(self, path, mappings_for_path):
-        if path[0] not in DRFViewMapper.mappings:
+        if path[0] not in mappings_for_path:
             if len(path) > 1:
                 mappings_for_path[path[0]] = self._update_mappings_for_path(
                     path=path[1:], mappings_for_path=dict()
@@ -47,17 +65,26 @@ class DRFViewMapper:
                     description=self.description,
                     query_serializer=None
                     if not self.query_serializer
-                    else TypeScriptInterfaceDefinition(self.query_serializer),
+                    else TypeScriptInterfaceDefinition.get(self.query_serializer),
                     body_serializer=None
                     if not self.body_serializer
-                    else TypeScriptInterfaceDefinition(self.body_serializer),
+                    else TypeScriptInterfaceDefinition.get(self.body_serializer),
                     response_serializer=None
                     if not self.response_serializer
-                    else TypeScriptInterfaceDefinition(self.response_serializer),
+                    else TypeScriptInterfaceDefinition.get(self.response_serializer),
+                    cache_ttl=self.cache_ttl,
+                    deduplicate=self.deduplicate,
+                    provides=self.provides,
+                    invalidates=self.invalidates,
+                    stale_while_revalidate=self.stale_while_revalidate,
+                    latest_wins=self.latest_wins,
+                    retry=self.retry,
+                    stream=self.stream,
+                    paginated=self.paginated,
                 )
-        elif isinstance(DRFViewMapper.mappings[path[0]], TypeScriptEndpointDefinition):
+        elif isinstance(mappings_for_path[path[0]], TypeScriptEndpointDefinition):
             return mappings_for_path
-        elif isinstance(DRFViewMapper.mappings[path[0]], dict):
+        elif isinstance(mappings_for_path[path[0]], dict):
             mappings_for_path[path[0]] = self._update_mappings_for_path(
                 path=path[1:], mappings_for_path=mappings_for_path[path[0]]
             )
@@ -94,7 +121,7 @@ class DRFSerializerMapper:
         DRFSerializerMapper.mappers.append(self)
 
     def _update_mappings(self):
-        definition = TypeScriptInterfaceDefinition(
+        definition = TypeScriptInterfaceDefinition.get(
             serializer=self.serializer,
             name=self.name,
             should_export=self.should_export,
@@ -0,0 +1,79 @@
+import hashlib
+import logging
+import os
+import time
+from typing import Optional, TextIO
+
+_logger = logging.getLogger(f"drf-tsdk.{__name__}")
+
+_CHUNK_SIZE = 64 * 1024
+
+
+class TypeScriptEmitter:
+    """Writes the generated TypeScript fragment by fragment to `sink`, any text file-like object,
+    while computing the SHA-256 of its UTF-8 encoding. Without a sink, the output is only hashed."""
+
+    def __init__(self, sink: Optional[TextIO] = None):
+        self.sink = sink
+        self.bytes_written = 0
+        self._sha = hashlib.sha256()
+
+    def write(self, text: str) -> None:
+        data = text.encode("utf-8")
+        self._sha.update(data)
+        self.bytes_written += len(data)
+        if self.sink is not None:
+            self.sink.write(text)
+
+    def hexdigest(self) -> str:
+        return self._sha.hexdigest()
+
+
+def get_file_digest(path: str) -> Optional[str]:
+    """Returns the SHA-256 of the file at `path`, read in chunks, or None if it does not exist"""
+    if not os.path.exists(path):
+        return None
+    sha = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(_CHUNK_SIZE), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class AtomicOutput:
+    """A context manager yielding an emitter which writes to a temporary file next to `output_path`.
+    On exit, the temporary file replaces `output_path` only if their contents differ, so that
+    watchers of `output_path` are not triggered by identical output. `changed` tells which it was,
+    and `exit_seconds` how long comparing and replacing took.
+
+        with AtomicOutput("api.ts") as emitter:
+            emitter.write(...)
+    """
+
+    def __init__(self, output_path: str):
+        self.output_path = output_path
+        self.tmp_path = f"{output_path}.{os.getpid()}.tmp"
+        self.changed = False
+        self.exit_seconds = 0.0
+        self._file = None
+        self._emitter = None
+
+    def __enter__(self) -> TypeScriptEmitter:
+        # `newline=""` keeps "\n" on every platform, so that the hash matches the file
+        self._file = open(self.tmp_path, "w", encoding="utf-8", newline="")
+        self._emitter = TypeScriptEmitter(self._file)
+        return self._emitter
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        start = time.perf_counter()
+        self._file.close()
+        if (
+            exc_type is None
+            and get_file_digest(self.output_path) != self._emitter.hexdigest()
+        ):
+            os.replace(self.tmp_path, self.output_path)
+            self.changed = True
+        else:
+            os.remove(self.tmp_path)
+        self.exit_seconds = time.perf_counter() - start
+        return False
@@ -0,0 +1,364 @@
+import datetime
+import decimal
+import enum
+import hashlib
+import logging
+import os
+import re
+import uuid
+from types import CodeType, FunctionType, ModuleType
+from typing import Callable, Optional
+
+from django.db.models.manager import BaseManager
+from django.db.models.query import QuerySet
+from django.utils.functional import Promise
+
+from rest_framework import serializers
+
+from .drf_to_ts import DRFSerializerMapper, DRFViewMapper
+from .helpers import SERIALIZER_FIELD_MAPPINGS
+from .pagination import get_pagination
+from .route_index import DecoratedViews
+from .runtime import ClientOptions
+from .settings import get_setting
+from .url_resolver import resolve_urls
+
+_logger = logging.getLogger(f"drf-tsdk.{__name__}")
+
+# bump this whenever a change to drf-tsdk changes the generated output for the same inputs
+FINGERPRINT_VERSION = "24"
+
+FINGERPRINT_COMMENT = "/** drf-tsdk fingerprint: %s */\n"
+
+# the fingerprint comment is expected near the top of the file, after whatever the post processor prepends
+_FINGERPRINT_SEARCH_SIZE = 16 * 1024
+_FINGERPRINT_RE = re.compile(r"/\*\* drf-tsdk fingerprint: ([0-9a-f]+) \*/")
+_ADDRESS_RE = re.compile(r" at 0x[0-9A-Fa-f]+")
+# the types whose `repr` describes their value, without side effects; other objects are only
+# described by their type, since e.g. the `repr` of a queryset runs a query
+_VALUE_TYPES = (
+    str,
+    bytes,
+    int,
+    float,
+    complex,
+    type(None),
+    decimal.Decimal,
+    datetime.date,
+    datetime.time,
+    datetime.timedelta,
+    enum.Enum,
+    uuid.UUID,
+    re.Pattern,
+)
+# the methods of a serializer which determine its fields; their overrides are part of its description
+_FIELD_METHODS = (
+    "get_fields",
+    "get_field_names",
+    "get_extra_kwargs",
+    "build_field",
+    "build_standard_field",
+    "build_relational_field",
+    "build_nested_field",
+    "build_property_field",
+    "build_url_field",
+    "build_unknown_field",
+)
+
+
+def _qualified_name(obj) -> str:
+    return f"{getattr(obj, '__module__', '')}.{getattr(obj, '__qualname__', getattr(obj, '__name__', repr(obj)))}"
+
+
+def _describe_const(const) -> str:
+    if isinstance(const, CodeType):
+        return _describe_code(const)
+    if isinstance(const, frozenset):
+        # the order of a set depends on the hash seed of the process
+        return repr(sorted(map(repr, const)))
+    return _ADDRESS_RE.sub("", repr(const))
+
+
+def _describe_code(code: CodeType) -> str:
+    return (
+        code.co_code.hex()
+        + "["
+        + ",".join(map(_describe_const, code.co_consts))
+        + "]"
+        + repr(code.co_names)
+    )
+
+
+def _get_global_names(code: CodeType) -> list:
+    """Returns the names `code` and the functions nested in it may look up in their globals"""
+    ret = list(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            ret.extend(_get_global_names(const))
+    return ret
+
+
+class InputFingerprinter:
+    """Computes a stable description of everything the generated TypeScript depends on,
+    from class-level declarations only, i.e. without instantiating any serializer."""
+
+    def __init__(self):
+        self._serializer_descriptions = {}
+        self._function_descriptions = {}
+
+    def describe(self, value) -> str:
+        if isinstance(value, serializers.Field):
+            return self.describe_field(value)
+        if isinstance(value, type):
+            if issubclass(value, serializers.BaseSerializer):
+                return self.describe_serializer_class(value)
+            return _qualified_name(value)
+        if isinstance(value, dict):
+            # insertion order is preserved, since it determines the order of the generated output
+            return (
+                "{"
+                + ",".join(
+                    f"{self.describe(k)}:{self.describe(v)}" for k, v in value.items()
+                )
+                + "}"
+            )
+        if isinstance(value, (list, tuple)):
+            return "[" + ",".join(self.describe(v) for v in value) + "]"
+        if isinstance(value, (set, frozenset)):
+            return "{" + ",".join(sorted(self.describe(v) for v in value)) + "}"
+        if isinstance(value, (QuerySet, BaseManager)):
+            # e.g. the `queryset` of a related field, which must not be evaluated
+            return f"{_qualified_name(type(value))}({_qualified_name(value.model)})"
+        if isinstance(value, Promise):
+            # e.g. a translated `help_text`
+            return repr(str(value))
+        if isinstance(value, ModuleType):
+            return value.__name__
+        if callable(value) and hasattr(value, "__qualname__"):
+            return _qualified_name(value)
+        if isinstance(value, _VALUE_TYPES):
+            return repr(value)
+        return _qualified_name(type(value))
+
+    def describe_field(self, field: serializers.Field) -> str:
+        ret = (
+            _qualified_name(type(field))
+            + self.describe(list(field._args))
+            + self.describe(field._kwargs)
+        )
+        if isinstance(field, serializers.BaseSerializer) and not isinstance(
+            field, serializers.ListSerializer
+        ):
+            ret += self.describe_serializer_class(type(field))
+        return ret
+
+    def describe_function(self, function) -> str:
+        """Describes the code of `function`, the values it closes over and the globals it uses, so
+        that changing any of them, or the code of the functions among them, changes the
+        description"""
+        function = getattr(function, "__func__", function)
+        if not isinstance(function, FunctionType):
+            return self.describe(function)
+        description = self._function_descriptions.get(function)
+        if description is not None:
+            return description
+
+        # guards against (mutually) recursive functions
+        self._function_descriptions[function] = _qualified_name(function)
+        closure = function.__closure__ or ()
+        values = {}
+        for name, cell in zip(function.__code__.co_freevars, closure):
+            try:
+                values[name] = cell.cell_contents
+            except ValueError:  # not assigned yet
+                values[name] = None
+        for name in _get_global_names(function.__code__):
+            if name in function.__globals__ and name not in values:
+                values[name] = function.__globals__[name]
+        description = (
+            _qualified_name(function)
+            + _describe_code(function.__code__)
+            + self.describe(function.__defaults__)
+            + self.describe(
+                {
+                    name: self.describe_function(value)
+                    if isinstance(value, FunctionType)
+                    else self.describe(value)
+                    for name, value in values.items()
+                }
+            )
+        )
+        description = hashlib.sha256(description.encode("utf-8")).hexdigest()
+        self._function_descriptions[function] = description
+        return description
+
+    def describe_serializer_class(self, serializer_class) -> str:
+        description = self._serializer_descriptions.get(serializer_class)
+        if description is not None:
+            return description
+
+        # guards against serializers which (indirectly) declare themselves as a field
+        self._serializer_descriptions[serializer_class] = _qualified_name(
+            serializer_class
+        )
+        description = _qualified_name(serializer_class) + self.describe(
+            getattr(serializer_class, "_declared_fields", {})
+        )
+        for name in _FIELD_METHODS:
+            method = getattr(serializer_class, name, None)
+            if method is not None and not getattr(method, "__module__", "").startswith(
+                "rest_framework."
+            ):
+                description += name + self.describe_function(method)
+        meta = getattr(serializer_class, "Meta", None)
+        model = getattr(meta, "model", None)
+        if model is not None:
+            description += self.describe(
+                {
+                    key: value
+                    for key, value in vars(meta).items()
+                    if not key.startswith("__")
+                }
+            )
+            description += self.describe(
+                [
+                    field.deconstruct()
+                    for field in model._meta.get_fields()
+                    if hasattr(field, "deconstruct")
+                ]
+            )
+        description = hashlib.sha256(description.encode("utf-8")).hexdigest()
+        self._serializer_descriptions[serializer_class] = description
+        return description
+
+    def describe_serializer(self, serializer) -> str:
+        if serializer is None:
+            return "None"
+        if isinstance(serializer, type):
+            return self.describe_serializer_class(serializer)
+        return self.describe_field(serializer)
+
+    def describe_url_patterns(self, urlpatterns) -> str:
+        descriptions = []
+        decorated_views = DecoratedViews(
+            view_mapper.view for view_mapper in DRFViewMapper.mappers
+        )
+        for url_pattern in resolve_urls(
+            urlpatterns,
+            should_include=decorated_views.should_include,
+            excluded_namespaces=get_setting("EXCLUDED_URL_NAMESPACES"),
+            should_descend=decorated_views.should_descend,
+        ):
+            callback = url_pattern.url_pattern.callback
+            view_class = getattr(callback, "view_class", None)
+            descriptions.append(
+                self.describe(
+                    [
+                        # route and regex prefixes are translated differently
+                        [
+                            _qualified_name(type(pattern)) + str(pattern)
+                            for pattern in url_pattern.prefixes
+                            + (url_pattern.url_pattern.pattern,)
+                        ],
+                        _qualified_name(callback),
+                        getattr(callback, "actions", None),
+                        getattr(callback, "cls", None),
+                        # `@api_view` builds `http_method_names` from a set
+                        sorted(
+                            getattr(
+                                getattr(callback, "cls", None), "http_method_names", []
+                            )
+                        ),
+                        None
+                        if view_class is None
+                        else sorted(
+                            k for k, v in view_class.__dict__.items() if callable(v)
+                        ),
+                        get_pagination(getattr(callback, "cls", None) or view_class),
+                    ]
+                )
+            )
+        return "\n".join(descriptions)
+
+    def describe_view_mapper(self, view_mapper) -> str:
+        return self.describe(
+            [
+                list(view_mapper.path),
+                _qualified_name(view_mapper.view),
+                view_mapper.description,
+                self.describe_serializer(view_mapper.query_serializer),
+                self.describe_serializer(view_mapper.body_serializer),
+                self.describe_serializer(view_mapper.response_serializer),
+                view_mapper.cache_ttl,
+                view_mapper.deduplicate,
+                view_mapper.provides,
+                view_mapper.invalidates,
+                view_mapper.stale_while_revalidate,
+                view_mapper.latest_wins,
+                view_mapper.retry,
+                view_mapper.stream,
+                view_mapper.paginated,
+            ]
+        )
+
+
+def get_fingerprint(
+    api_name: str,
+    headers: dict,
+    csrf_token_variable_name: Optional[str],
+    post_processor: Optional[Callable[[str], str]],
+    urlpatterns,
+    client_options: ClientOptions = ClientOptions(),
+) -> str:
+    """Returns a hash of every input of the generated TypeScript API client: the registered
+    views and serializers and their field declarations, the URL patterns, the generator
+    arguments and client options, and `SERIALIZER_FIELD_MAPPINGS`."""
+    fingerprinter = InputFingerprinter()
+    sha = hashlib.sha256()
+    for part in [
+        FINGERPRINT_VERSION,
+        api_name,
+        fingerprinter.describe(headers),
+        str(csrf_token_variable_name),
+        fingerprinter.describe_function(post_processor),
+        fingerprinter.describe(client_options._asdict()),
+        fingerprinter.describe(
+            {
+                _qualified_name(field_class): ts_type
+                for field_class, ts_type in SERIALIZER_FIELD_MAPPINGS.items()
+            }
+        ),
+    ]:
+        sha.update(part.encode("utf-8") + b"\0")
+
+    for serializer_mapper in DRFSerializerMapper.mappers:
+        sha.update(
+            fingerprinter.describe(
+                [
+                    fingerprinter.describe_serializer_class(
+                        serializer_mapper.serializer
+                    ),
+                    serializer_mapper.name,
+                    serializer_mapper.should_export,
+                    serializer_mapper.method,
+                ]
+            ).encode("utf-8")
+            + b"\0"
+        )
+
+    for view_mapper in DRFViewMapper.mappers:
+        sha.update(
+            fingerprinter.describe_view_mapper(view_mapper).encode("utf-8") + b"\0"
+        )
+
+    sha.update(fingerprinter.describe_url_patterns(urlpatterns).encode("utf-8"))
+    return sha.hexdigest()
+
+
+def read_fingerprint(output_path: str) -> Optional[str]:
+    """Returns the fingerprint stored in the generated file at `output_path`, if any"""
+    if not os.path.exists(output_path):
+        return None
+    with open(output_path, "r", encoding="utf-8") as output_file:
+        match = _FINGERPRINT_RE.search(output_file.read(_FINGERPRINT_SEARCH_SIZE))
+    return match.group(1) if match else None
@@ -1,32 +1,109 @@
-import inspect
+import hashlib
+import io
+import itertools
 import json
 import logging
 import os
 import re
-from typing import Any, Callable, List, Optional
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import (
+    Callable,
+    ContextManager,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Union,
+)
 
-from django.urls import URLPattern
+from django.conf import settings
+from django.utils.autoreload import DJANGO_AUTORELOAD_ENV
+from django.views import View
 
 from .drf_to_ts import DRFSerializerMapper, DRFViewMapper
+from .emitter import AtomicOutput, TypeScriptEmitter, get_file_digest
 from .exceptions import DRFTypeScriptAPIClientException
+from .fingerprint import FINGERPRINT_COMMENT, get_fingerprint, read_fingerprint
+from .helpers import TypeScriptInterfaceDefinition
+from .inline_types import InlineTypeAliases
+from .instrumentation import measure_generation
+from .pagination import Pagination, get_pagination
+from .render_cache import RenderCache, get_render_cache
+from .route_index import DecoratedViews, Route, RouteIndex
+from .route_translator import translate_url
+from .runtime import (
+    RUNTIME_TYPES,
+    RUNTIME_VALUES,
+    ClientOptions,
+    get_runtime_text,
+    get_ts_milliseconds,
+)
+from .settings import get_setting
 from .url_resolver import resolve_urls
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
 # import jsbeautifier
 
 
 _logger = logging.getLogger(f"drf-tsdk.{__name__}")
 
+GENERATION_MODES = ("eager", "deferred", "debug", "background")
+LAYOUTS = ("file", "directory")
+
+# generation arguments recorded by `generate_typescript_bindings` when generation is deferred, keyed by output path
+deferred_targets: Dict[str, dict] = {}
+
+_defer_depth = 0
+_generation_lock = threading.Lock()
+
+
+# the order in which the methods of a view are routed
+_HTTP_METHOD_ORDER = View.http_method_names
+
+# the methods of the endpoints which are retried without setting `retry`
+_IDEMPOTENT_METHODS = ("get", "head", "options", "put", "delete")
+
+# the modules of a client generated with `layout="directory"`, besides one per namespace
+_RUNTIME_MODULE = "runtime"
+_TYPES_MODULE = "types"
+_INDEX_MODULE = "index"
+_LAZY_MODULE = "lazy"
+_RESERVED_NAMESPACES = (_RUNTIME_MODULE, _TYPES_MODULE, _INDEX_MODULE, _LAZY_MODULE)
+_NAMESPACE_EXPORT_RE = re.compile(
+    r'^export \{ default as \w+ \} from "\./([^"/]+)";$', re.MULTILINE
+)
+_IDENTIFIER_RE = re.compile(r"^[A-Za-z_$][0-9A-Za-z_$]*$")
+# the words which may not name a variable in a module, e.g. `import delete from "./delete"`
+_RESERVED_WORDS = frozenset(
+    (
+        "arguments await break case catch class const continue debugger default delete do "
+        "else enum eval export extends false finally for function if implements import in "
+        "instanceof interface let new null package private protected public return static "
+        "super switch this throw true try typeof var void while with yield"
+    ).split()
+)
+
+_DEFAULT_PREAMBLE = "/** This file was generated automatically by drf-tsdk. */" + "\n\n"
+
 
 def _default_processor(content):
-    return (
-        "/** This file was generated automatically by drf-tsdk. */" + "\n\n" + content
-    )
+    return _DEFAULT_PREAMBLE + content
 
 
 def _get_ts_interface_text(value) -> str:
     text = (
         f"{'export ' if value.should_export else ''} interface {value.name} "
-        + value.ts_definition_string(is_interface_definition=True, method=value.method)
+        + value._get_marked_ts_definition_string(
+            is_interface_definition=True, method=value.method
+        )
     )
     return text
 
@@ -47,167 +124,377 @@ def _get_headers(headers, csrf_token_variable_name) -> str:
     return ret_stringified
 
 
-# TODO: this is pretty hacky, and probably doesn't work in certain cases, esp. with regex. Need to refactor this.
+def _get_retry_policy(
+    method: str, retry: Optional[dict], client_options: ClientOptions
+) -> Optional[str]:
+    """Returns the TypeScript `RetryPolicy` of an endpoint, or None if it is not retried"""
+    if retry is None and method.lower().strip() not in _IDEMPOTENT_METHODS:
+        return None
+    policy = dict(
+        attempts=client_options.retry_attempts,
+        backoff=client_options.retry_backoff,
+        max_backoff=client_options.retry_max_backoff,
+        jitter=client_options.retry_jitter,
+        retry_after=client_options.retry_after,
+    )
+    policy.update(retry or {})
+    if policy["attempts"] <= 1:
+        return None
+    return (
+        "{ attempts: %d, backoff: %s, maxBackoff: %s, jitter: %s, retryAfter: %s }"
+        % (
+            policy["attempts"],
+            get_ts_milliseconds(policy["backoff"]),
+            get_ts_milliseconds(policy["max_backoff"]),
+            json.dumps(policy["jitter"]),
+            json.dumps(policy["retry_after"]),
+        )
+    )
 
 
-def _get_url(value, url_patterns: dict) -> (str, str, List[str], Any):
-    """Returns URL and method of the endpoint"""
+def _get_item_type(response_serializer, response_type: str) -> str:
+    """Returns the TypeScript type of the items streamed or paginated by an endpoint, which are
+    those of its response if it is a `many=True` serializer"""
+    if (
+        response_serializer is not None
+        and response_serializer.is_many
+        and response_type.endswith("[]")
+    ):
+        return response_type[: -len("[]")]
+    return response_type
 
-    url_pattern = url_patterns.get(
-        inspect.getmodule(value.view).__name__ + ":" + value.view.__qualname__
-    )
-    if url_pattern:
-        return url_pattern
 
-    url_pattern = url_patterns.get(
-        inspect.getmodule(value.view).__name__ + ":" + value.view.__name__
-    )
-    if url_pattern:
-        return url_pattern
-
-    if hasattr(str(value.view), "cls"):
-        url_pattern = url_patterns.get(str(value.view.cls))
-        if url_pattern:
-            return url_pattern
-
-    url_pattern = next(
-        iter(
-            [
-                x
-                for x in url_patterns.values()
-                if x[3].__module__ == value.view.__module__
-                and x[3].cls.__name__ == value.view.cls.__name__
-            ]
-        ),
-        None,
-    )
-    if url_pattern:
-        return url_pattern
-
-    raise DRFTypeScriptAPIClientException(
-        f"No pattern found for View {str(value.view)} {str(value.view.__name__)} in module {str(value.view.__module__)} line {value.view.__code__.co_firstlineno}"
-    )
+def _get_endpoint_pagination(value, method: str, callback, path: tuple) -> Pagination:
+    """Returns the pagination of the endpoint `value`, declared with `paginated=True`"""
+    if (
+        method.lower() != "get"
+        or value.stream
+        or not value.response_serializer
+        or not value.response_serializer.is_many
+    ):
+        raise DRFTypeScriptAPIClientException(
+            "The endpoint `%s` is paginated, but is not a GET endpoint with a `many=True` "
+            "response serializer." % ".".join(path)
+        )
+    view_class = getattr(callback, "cls", None) or getattr(callback, "view_class", None)
+    pagination = get_pagination(view_class)
+    if pagination is None:
+        raise DRFTypeScriptAPIClientException(
+            "The endpoint `%s` is paginated, but the `pagination_class` of `%s` does not derive "
+            "from `PageNumberPagination`, `LimitOffsetPagination` or `CursorPagination`, or "
+            "overrides `get_paginated_response`."
+            % (".".join(path), view_class.__qualname__)
+        )
+    return pagination
 
 
 def _get_ts_endpoint_text(
-    key, value, headers, csrf_token_variable_name, url_patterns
+    key,
+    value,
+    route_index: RouteIndex,
+    render_cache: Optional[RenderCache] = None,
+    path: tuple = (),
+    client_options: ClientOptions = ClientOptions(),
 ) -> str:
+    """Returns the text of the endpoint `value`, registered as `key` under `path`"""
+    if render_cache is not None:
+        cache_key = render_cache.endpoint_key(
+            path + (key,), route_index.get(value.view, path + (key,))
+        )
+        text = render_cache.get(cache_key)
+        if text is None:
+            text = _get_ts_endpoint_text(
+                key,
+                value,
+                route_index,
+                path=path,
+                client_options=client_options,
+            )
+            render_cache.set(cache_key, text)
+        return text
+
     text = ""
-    if not isinstance(value, dict) and value.description:
+    if value.description:
         text += "/** " + value.description.replace("\n", "\n * ") + " */\n"
-    text += f"{key}:"
-    if isinstance(value, dict):
-        text += " {"
-        for _key, _value in value.items():
-            text += "\n"
-            text += _get_ts_endpoint_text(
-                _key, _value, headers, csrf_token_variable_name, url_patterns
-            )
-        text += "\n" + "},"
-    else:
-        # print(_get_url(value, url_patterns))
-        url, method, args, _ = _get_url(value, url_patterns)
-        text += (
-            " (\n"
-            + (",\n").join([f"{arg}: string" for arg in args])
-            + ((",\n") if len(args) > 0 else "")
-            + "params: {\n"
-            + (
-                ""
-                if not value.query_serializer
-                else "query?: "
-                + value.query_serializer.ts_definition_string(method="read")
-                + ",\n"
-            )
-            + (
-                ""
-                if not value.body_serializer
-                else "data?: "
-                + value.body_serializer.ts_definition_string(method="write")
-                + ",\n"
-            )
-            + "options?: RequestInit,\n"
-            + "/** Called when the request returns a successful response */\n"
-            + "onSuccess?(result: "
-            + (
-                "any"
-                if not value.response_serializer
-                else value.response_serializer.ts_definition_string(method="read")
-            )
-            + "): void,\n"
-            + "/** Called when the request errors out */\n"
-            + "onError?(error: any): void,\n"
-            + (
-                (
-                    "/** If `true`, uses data that was cached previously when this request returned a successful response. */\n"
-                    + "shouldUseCache?: boolean = false,\n"
-                    + "/** If `true`, caches the returned data if the request is successful. */\n"
-                    + "shouldUpdateCache?: boolean = false\n"
-                )
-                if method.lower().strip() == "get"
-                else ""
-            )
-            + "},\n"
-            + ") : Promise<Response> "
-            + ("?" if method.lower().strip() == "get" else "")
-            + " => {\n"
-            + "const requestPath = "
-            + url
-            + ' + (params.query ? ("?" + new URLSearchParams(params.query).toString()) : "");'
-            + (
-                (
-                    "if (params.shouldUseCache && cache[requestPath]) { params.onSuccess && params.onSuccess(cache[requestPath]) } else {"
+    url, method, args, callback = route_index.get(value.view, path + (key,))
+    # responses to GET endpoints are cached, unless they are streamed
+    is_cached = method.lower().strip() == "get" and not value.stream
+    response_type = (
+        "any"
+        if not value.response_serializer
+        else value.response_serializer._get_marked_ts_definition_string(method="read")
+    )
+    pagination = None
+    if value.paginated:
+        pagination = _get_endpoint_pagination(value, method, callback, path + (key,))
+        response_type = "%s<%s>" % (
+            pagination.envelope,
+            _get_item_type(value.response_serializer, response_type),
+        )
+    query_type = " & ".join(
+        query_type
+        for query_type in (
+            value.query_serializer
+            and value.query_serializer._get_marked_ts_definition_string(method="read"),
+            pagination and pagination.ts_query_string(),
+        )
+        if query_type
+    )
+    params_type = "%s<%s, %s, %s>" % (
+        "StreamParams"
+        if value.stream
+        else "GetParams"
+        if is_cached
+        else "RequestParams",
+        query_type or "never",
+        "never"
+        if not value.body_serializer
+        else value.body_serializer._get_marked_ts_definition_string(method="write"),
+        _get_item_type(value.response_serializer, response_type)
+        if value.stream
+        else response_type,
+    )
+
+    # the flags left out are `false` at runtime
+    descriptor = {
+        "method": json.dumps(method),
+        "endpoint": json.dumps(".".join(path + (key,))),
+    }
+    if is_cached:
+        descriptor["cached"] = "true"
+        if value.stale_while_revalidate:
+            descriptor["staleWhileRevalidate"] = "true"
+        if (
+            client_options.deduplicate_requests
+            if value.deduplicate is None
+            else value.deduplicate
+        ):
+            descriptor["deduplicate"] = "true"
+    if value.cache_ttl is not None:
+        descriptor["ttl"] = get_ts_milliseconds(value.cache_ttl)
+    if value.latest_wins:
+        descriptor["latestWins"] = "true"
+    retry_policy = _get_retry_policy(method, value.retry, client_options)
+    if retry_policy is not None:
+        descriptor["retry"] = retry_policy
+    if value.stream:
+        descriptor["stream"] = "true"
+    if value.invalidates:
+        descriptor["invalidates"] = json.dumps(list(value.invalidates))
+
+    text += "%s: (%sparams: %s): CancelablePromise<void> =>\n" % (
+        key,
+        "".join(f"{arg}: string, " for arg in args),
+        params_type,
+    )
+    text += "request({ %s }, %s, params)," % (
+        ", ".join(f"{name}: {literal}" for name, literal in descriptor.items()),
+        url,
+    )
+    return text
+
+
+def _iter_endpoint_texts(
+    route_index: RouteIndex,
+    render_cache: Optional[RenderCache] = None,
+    client_options: ClientOptions = ClientOptions(),
+) -> Iterator[str]:
+    stack = [((), DRFViewMapper.mappings)]
+    while stack:
+        path, mappings = stack.pop()
+        for key, value in mappings.items():
+            if isinstance(value, dict):
+                stack.append((path + (key,), value))
+            else:
+                yield _get_ts_endpoint_text(
+                    key,
+                    value,
+                    route_index,
+                    render_cache=render_cache,
+                    path=path,
+                    client_options=client_options,
                 )
-                if method.lower().strip() == "get"
-                else ""
-            )
-            + "return fetch(requestPath, {\n"
-            + 'method: "'
-            + method
-            + '",\n'
-            + "headers: "
-            + _get_headers(headers, csrf_token_variable_name)
-            + ",\n"
-            + (
-                ""
-                if not value.body_serializer
-                else "body: JSON.stringify(params.data),\n"
+
+
+def _emit_ts_endpoints(
+    emitter: TypeScriptEmitter, key, value, fragments: "_Fragments", path: tuple = ()
+) -> None:
+    if not isinstance(value, dict):
+        emitter.write(fragments.get_endpoint_text(key, value, path))
+        return
+
+    emitter.write(f"{key}: {{")
+    for _key, _value in value.items():
+        emitter.write("\n")
+        _emit_ts_endpoints(emitter, _key, _value, fragments, path=path + (key,))
+    emitter.write("\n},")
+
+
+def _get_cache_tags(route_index: RouteIndex) -> Dict[str, List[str]]:
+    """Returns the paths of the GET endpoints providing each cache tag"""
+    ret = dict()
+    stack = [((), DRFViewMapper.mappings)]
+    while stack:
+        path, mappings = stack.pop()
+        for key, value in mappings.items():
+            if isinstance(value, dict):
+                stack.append((path + (key,), value))
+            elif (
+                value.provides
+                and route_index.get(value.view, path + (key,)).method.lower().strip()
+                == "get"
+            ):
+                for tag in value.provides:
+                    ret.setdefault(tag, []).append(".".join(path + (key,)))
+    return {tag: sorted(endpoints) for tag, endpoints in sorted(ret.items())}
+
+
+def _iter_interface_texts(render_cache: Optional[RenderCache] = None) -> Iterator[str]:
+    for serializer, value in DRFSerializerMapper.mappings.items():
+        if render_cache is None:
+            yield _get_ts_interface_text(value)
+        else:
+            cache_key = render_cache.interface_key(serializer, value)
+            text = render_cache.get(cache_key)
+            if text is None:
+                text = _get_ts_interface_text(value)
+                render_cache.set(cache_key, text)
+            yield text
+
+
+class _Fragments:
+    """The interfaces and endpoints of the client. They are rendered once to find the inline types
+    repeated across them, then rendered again as they are written, with those types replaced by
+    their aliases, so that the whole client is never held in memory."""
+
+    def __init__(
+        self,
+        route_index: RouteIndex,
+        render_cache: Optional[RenderCache] = None,
+        client_options: ClientOptions = ClientOptions(),
+    ):
+        self._route_index = route_index
+        self._render_cache = render_cache
+        self._client_options = client_options
+        self.inline_types = InlineTypeAliases(
+            itertools.chain(
+                _iter_interface_texts(render_cache),
+                _iter_endpoint_texts(route_index, render_cache, client_options),
+            ),
+            reserved_names=_get_interface_names(),
+        )
+
+    def iter_interface_texts(self) -> Iterator[str]:
+        for text in _iter_interface_texts(self._render_cache):
+            yield self.inline_types.resolve(text)
+
+    def get_endpoint_text(self, key, value, path: tuple) -> str:
+        return self.inline_types.resolve(
+            _get_ts_endpoint_text(
+                key,
+                value,
+                self._route_index,
+                render_cache=self._render_cache,
+                path=path,
+                client_options=self._client_options,
             )
-            + "...params.options, \n"
-            + "})\n"
-            + """.then((response) => {
-                if (response.ok) {
-                    return response.json()
-                        .then((result) => {
-                            if (params.shouldUpdateCache){ cache[requestPath] = result }; params.onSuccess && params.onSuccess(result)
-            })
-                        .catch((error) => params.onError && params.onError(error))
-                }
-                return response.text()
-                    .then((result) => params.onError && params.onError({
-                        response: response,
-                        status: response.status,
-                        statusText: response.statusText,
-                        message: result
-                    }))
-                    .catch((error) => params.onError && params.onError(error))
-                })
-            }"""
-            + ("}," if method.lower().strip() == "get" else ",")
         )
-    return text
 
 
-def _get_typescript_bindings(
+def _emit_interfaces(emitter: TypeScriptEmitter, fragments: _Fragments) -> None:
+    sep = ""
+    for text in fragments.iter_interface_texts():
+        emitter.write(sep)
+        emitter.write(text)
+        sep = "\n\n"
+    if fragments.inline_types.aliases:
+        emitter.write(sep)
+        emitter.write(fragments.inline_types.get_declarations_text())
+
+
+def _get_interface_names(should_export: Optional[bool] = None) -> List[str]:
+    """Returns the names of the interfaces which can be imported from the types module, i.e. all
+    of them, or only those which are or are not exported"""
+    return list(
+        dict.fromkeys(
+            value.name
+            for value in DRFSerializerMapper.mappings.values()
+            if _IDENTIFIER_RE.match(value.name)
+            and (should_export is None or value.should_export == should_export)
+        )
+    )
+
+
+def _emit_typescript_body(
+    emitter: TypeScriptEmitter,
     api_name: str,
     headers: dict,
     csrf_token_variable_name: Optional[str],
-    post_processor: Callable[[str], str],
-    url_patterns: List[URLPattern],
-) -> str:
+    route_index: RouteIndex,
+    fingerprint: Optional[str] = None,
+    render_cache: Optional[RenderCache] = None,
+    client_options: ClientOptions = ClientOptions(),
+) -> None:
+    if fingerprint is not None:
+        emitter.write(FINGERPRINT_COMMENT % fingerprint + "\n")
+
+    # runtime
+    emitter.write(
+        get_runtime_text(
+            client_options,
+            _get_cache_tags(route_index),
+            _get_headers(headers, csrf_token_variable_name),
+        )
+    )
+
+    fragments = _Fragments(route_index, render_cache, client_options)
+    _emit_interfaces(emitter, fragments)
+    emitter.write("\n\n")
+
+    emitter.write(f"const {api_name} = {{\n")
+
+    # endpoints
+    sep = ""
+    for key, value in DRFViewMapper.mappings.items():
+        emitter.write(sep)
+        _emit_ts_endpoints(emitter, key, value, fragments)
+        sep = "\n"
+
+    emitter.write(f"\n}};\n\nexport default {api_name};\n")
+
+
+def _emit_typescript_bindings(
+    emitter: TypeScriptEmitter,
+    api_name: str,
+    headers: dict,
+    csrf_token_variable_name: Optional[str],
+    post_processor: Optional[Callable[[str], str]],
+    route_index: RouteIndex,
+    fingerprint: Optional[str] = None,
+    render_cache: Optional[RenderCache] = None,
+    client_options: ClientOptions = ClientOptions(),
+) -> None:
     """
-    Generates the TypeScript API Client documentation text.
+    Generates the TypeScript API Client documentation text, fragment by fragment.
     """
+    _validate_api_name(api_name)
+    _emit_processed(
+        emitter,
+        post_processor,
+        lambda body_emitter: _emit_typescript_body(
+            body_emitter,
+            api_name=api_name,
+            headers=headers,
+            csrf_token_variable_name=csrf_token_variable_name,
+            route_index=route_index,
+            fingerprint=fingerprint,
+            render_cache=render_cache,
+            client_options=client_options,
+        ),
+    )
+
+
+def _validate_api_name(api_name: str) -> None:
     if re.search(r"[^0-9A-Za-z_]", api_name):
         raise DRFTypeScriptAPIClientException(
             "`class_name` may only contain alphanumeric characters,"
@@ -217,36 +504,234 @@ def _get_typescript_bindings(
             "`class_name` must not begin with a number."
         )
 
-    content = ""
 
-    # cache
-    content += "const cache = {};\n\n"
+def _emit_processed(
+    emitter: TypeScriptEmitter,
+    post_processor: Optional[Callable[[str], str]],
+    emit_body: Callable[[TypeScriptEmitter], None],
+) -> None:
+    """Writes the text written by `emit_body` to `emitter`, processed by `post_processor`"""
+    if post_processor is None or post_processor is _default_processor:
+        if post_processor is _default_processor:
+            emitter.write(_DEFAULT_PREAMBLE)
+        emit_body(emitter)
+    else:
+        # a custom post processor needs the whole text
+        buffer = io.StringIO()
+        emit_body(TypeScriptEmitter(buffer))
+        emitter.write(post_processor(buffer.getvalue()))
 
-    # interfaces
-    sep = ""
-    for _, value in DRFSerializerMapper.mappings.items():
-        content += sep
-        content += _get_ts_interface_text(value)
-        sep = "\n\n"
 
-    content += "\n\n"
+def _emit_namespace_module(
+    emitter: TypeScriptEmitter, key, value, api_name: str, fragments: _Fragments
+) -> None:
+    emitter.write(
+        'import { %s } from "./%s";\n' % (", ".join(RUNTIME_VALUES), _RUNTIME_MODULE)
+    )
+    emitter.write(
+        'import type { %s } from "./%s";\n'
+        % (", ".join(RUNTIME_TYPES), _RUNTIME_MODULE)
+    )
+    type_names = _get_interface_names() + list(fragments.inline_types.aliases.values())
+    if type_names:
+        emitter.write(
+            'import type { %s } from "./%s";\n' % (", ".join(type_names), _TYPES_MODULE)
+        )
+    emitter.write(f"\nconst {api_name} = {{\n")
+    _emit_ts_endpoints(emitter, key, value, fragments)
+    emitter.write(f"\n}};\n\nexport default {api_name}.{key};\n")
 
-    content += f"const {api_name} = {{\n"
 
-    # endpoints
-    sep = ""
+def _emit_types_module(emitter: TypeScriptEmitter, fragments: _Fragments) -> None:
+    _emit_interfaces(emitter, fragments)
+    private_names = _get_interface_names(should_export=False) + list(
+        fragments.inline_types.aliases.values()
+    )
+    if private_names:
+        # imported by the namespace modules, but not exported by the index
+        emitter.write("\n\nexport type { %s };" % ", ".join(private_names))
+    emitter.write("\n")
+
+
+def _get_namespace_variable(namespace: str) -> str:
+    """Returns the name of the variable holding `namespace`, suffixed with `_` if it is a reserved
+    word"""
+    return namespace + "_" if namespace in _RESERVED_WORDS else namespace
+
+
+def _emit_index_module(
+    emitter: TypeScriptEmitter,
+    api_name: str,
+    namespaces: List[str],
+    fingerprint: Optional[str] = None,
+) -> None:
+    if fingerprint is not None:
+        emitter.write(FINGERPRINT_COMMENT % fingerprint + "\n")
+    emitter.write('export * from "./%s";\n' % _RUNTIME_MODULE)
+    interface_names = _get_interface_names(should_export=True)
+    if interface_names:
+        emitter.write(
+            'export type { %s } from "./%s";\n'
+            % (", ".join(interface_names), _TYPES_MODULE)
+        )
+    emitter.write("\n")
+    for namespace in namespaces:
+        emitter.write(
+            'export { default as %s } from "./%s";\n'
+            % (_get_namespace_variable(namespace), namespace)
+        )
+    emitter.write("\n")
+    for namespace in namespaces:
+        emitter.write(
+            'import %s from "./%s";\n' % (_get_namespace_variable(namespace), namespace)
+        )
+    properties = ", ".join(
+        namespace
+        if _get_namespace_variable(namespace) == namespace
+        else f"{namespace}: {_get_namespace_variable(namespace)}"
+        for namespace in namespaces
+    )
+    emitter.write(
+        f"\nconst {api_name} = {{ {properties} }};\n\nexport default {api_name};\n"
+    )
+
+
+def _emit_lazy_module(emitter: TypeScriptEmitter, namespaces: List[str]) -> None:
+    # importing the index would bundle every namespace along with it
+    emitter.write(
+        "/** Loads a namespace on demand, e.g. `const foo = await load.foo()`, so that bundlers split it into its own chunk */\n"
+        + "export const load = {\n"
+    )
+    for namespace in namespaces:
+        emitter.write(
+            '%s: () => import("./%s").then((module) => module.default),\n'
+            % (namespace, namespace)
+        )
+    emitter.write("};\n")
+
+
+def _emit_typescript_modules(
+    open_module: Callable[[str], ContextManager[TypeScriptEmitter]],
+    api_name: str,
+    headers: dict,
+    csrf_token_variable_name: Optional[str],
+    post_processor: Optional[Callable[[str], str]],
+    route_index: RouteIndex,
+    fingerprint: Optional[str] = None,
+    render_cache: Optional[RenderCache] = None,
+    client_options: ClientOptions = ClientOptions(),
+) -> List[str]:
+    """
+    Generates the TypeScript API Client as a runtime module, a module of interfaces, one module
+    per top-level namespace, a module loading them lazily and an index, each written to
+    `open_module(name)`. The index is written last, since it holds the fingerprint. Returns the
+    namespaces.
+    """
+    _validate_api_name(api_name)
+    namespaces = list(DRFViewMapper.mappings.keys())
+    for namespace in namespaces:
+        if (
+            namespace in _RESERVED_NAMESPACES
+            or namespace == api_name
+            or namespace != _get_namespace_variable(namespace)
+            and _get_namespace_variable(namespace) in namespaces
+        ):
+            raise DRFTypeScriptAPIClientException(
+                f"The namespace `{namespace}` is reserved by the directory layout."
+            )
+
+    def write_module(name: str, emit_body: Callable[[TypeScriptEmitter], None]):
+        with open_module(name) as emitter:
+            _emit_processed(emitter, post_processor, emit_body)
+
+    write_module(
+        _RUNTIME_MODULE,
+        lambda emitter: emitter.write(
+            get_runtime_text(
+                client_options,
+                _get_cache_tags(route_index),
+                _get_headers(headers, csrf_token_variable_name),
+            )
+        ),
+    )
+    fragments = _Fragments(route_index, render_cache, client_options)
+    write_module(_TYPES_MODULE, lambda emitter: _emit_types_module(emitter, fragments))
     for key, value in DRFViewMapper.mappings.items():
-        content += sep
-        content += _get_ts_endpoint_text(
-            key, value, headers, csrf_token_variable_name, url_patterns
+        write_module(
+            key,
+            lambda emitter: _emit_namespace_module(
+                emitter, key, value, api_name, fragments
+            ),
         )
-        sep = "\n"
+    write_module(_LAZY_MODULE, lambda emitter: _emit_lazy_module(emitter, namespaces))
+    write_module(
+        _INDEX_MODULE,
+        lambda emitter: _emit_index_module(
+            emitter, api_name, namespaces, fingerprint=fingerprint
+        ),
+    )
+    return namespaces
+
+
+@contextmanager
+def defer_generation():
+    """Within this context, every call to `generate_typescript_bindings` is recorded
+    in `deferred_targets` instead of being run, regardless of `GENERATION_MODE`."""
+    global _defer_depth
+    _defer_depth += 1
+    try:
+        yield
+    finally:
+        _defer_depth -= 1
 
-    content += f"\n}};\n\nexport default {api_name};\n"
 
-    if post_processor is not None:
-        content = post_processor(content)
-    return content
+def generate_deferred_typescript_bindings() -> List[str]:
+    """Runs every generation recorded in `deferred_targets` and returns their output paths"""
+    for kwargs in deferred_targets.values():
+        _generate_typescript_bindings(**kwargs)
+    return list(deferred_targets.keys())
+
+
+@contextmanager
+def _lock_across_processes(output_path: str):
+    """Yields whether this process acquired the lock of `output_path`, which no other process,
+    e.g. another worker of the same web server, acquires until it is released"""
+    if fcntl is None:
+        yield True
+        return
+    lock_path = os.path.join(
+        tempfile.gettempdir(),
+        "drf-tsdk-%s.lock"
+        % hashlib.sha1(os.path.abspath(output_path).encode("utf-8")).hexdigest()[:16],
+    )
+    with open(lock_path, "a") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _generate_in_background(kwargs: dict) -> None:
+    def target():
+        try:
+            with _lock_across_processes(kwargs["output_path"]) as is_locked:
+                if not is_locked:
+                    _logger.debug(
+                        "Another process is generating %s", kwargs["output_path"]
+                    )
+                    return
+                _generate_typescript_bindings(**kwargs)
+        except Exception:
+            _logger.exception(
+                "Failed to generate the TypeScript SDK at %s", kwargs["output_path"]
+            )
+
+    threading.Thread(target=target, name="drf-tsdk-generation", daemon=True).start()
 
 
 def generate_typescript_bindings(
@@ -256,6 +741,20 @@ def generate_typescript_bindings(
     csrf_token_variable_name: Optional[str] = None,
     post_processor: Optional[Callable[[str], str]] = _default_processor,
     urlpatterns=None,
+    mode: Optional[str] = None,
+    layout: str = "file",
+    cache_max_entries: int = 500,
+    cache_ttl: Optional[float] = None,
+    deduplicate_requests: bool = False,
+    batch_url: Optional[str] = None,
+    batch_window: float = 0,
+    batch_max_requests: int = 50,
+    timeout: Optional[float] = None,
+    retry_attempts: int = 1,
+    retry_backoff: float = 0.5,
+    retry_max_backoff: float = 30,
+    retry_jitter: bool = True,
+    retry_after: bool = True,
 ) -> None:
     """Generates the TypeScript API Client .ts file
 
@@ -264,6 +763,41 @@ def generate_typescript_bindings(
     :param str csrf_token_variable_name: A variable name, function call, or other JavaScript-evaluable string which returns the CSRF token
     :param str api_name: The name of the API object
     :param post_processor: If provided, processes the API documentation after compiling and before writing the file (to add a comment or other markup, for instance).
+    :param str mode: When the file is generated. Defaults to the `GENERATION_MODE` setting.
+        "eager" generates it immediately; "deferred" only records the arguments so that the
+        `generate_api_client` management command can generate it later; "debug" generates it in a
+        background thread, and only when `DEBUG` is set and the runserver autoreloader is running;
+        "background" always generates it in a background thread.
+    :param str layout: "file" writes the client to `output_path`. "directory" writes it as modules in
+        the directory `output_path`: `runtime.ts`, `types.ts` for the interfaces, one module per
+        top-level namespace of the API, e.g. `foo.ts`, `index.ts`, which re-exports them, and
+        `lazy.ts`, which imports them dynamically, so that bundlers only include the namespaces
+        which are used, or split them into chunks. The `post_processor` processes each module.
+    :param int cache_max_entries: The maximum number of responses kept by the client's `cache`,
+        beyond which the least recently used ones are evicted.
+    :param float cache_ttl: The number of seconds responses are cached for, unless their endpoint
+        sets its own `cache_ttl`. By default, they never expire.
+    :param bool deduplicate_requests: If `True`, concurrent identical calls to a GET endpoint share a
+        single request, unless the endpoint sets `deduplicate=False`.
+    :param str batch_url: If provided, the client sends its requests in batches to this URL,
+        which should route to `drf_tsdk.batch.BatchView`.
+    :param float batch_window: The number of seconds after a request during which the following
+        requests are batched with it. If 0, the requests made within the same task are batched.
+    :param int batch_max_requests: The maximum number of requests in a batch, which should match the
+        `max_requests` of the `BatchView`.
+    :param float timeout: The number of seconds after which requests are aborted, unless a call
+        passes its own `timeoutMs`. By default, requests never time out.
+    :param int retry_attempts: The maximum number of attempts of a request after a 408, 429, 502,
+        503 or 504 response, or a network error. By default, requests are not retried. Only the
+        endpoints of idempotent methods are retried, unless an endpoint sets its own `retry`.
+    :param float retry_backoff: The number of seconds before the first retry, doubled before each
+        of the following ones.
+    :param float retry_max_backoff: The maximum number of seconds before a retry, which also bounds
+        the delay a `Retry-After` header asks for.
+    :param bool retry_jitter: If `True`, each delay is drawn at random between 0 and its backoff, so
+        that clients do not retry in lockstep.
+    :param bool retry_after: If `True`, the `Retry-After` header of a response overrides its backoff,
+        up to `retry_max_backoff`.
 
     Ex:
     comment='// this is a comment'
@@ -279,175 +813,495 @@ def generate_typescript_bindings(
     if post_processor is not None and not callable(post_processor):
         raise TypeError("`post_processor` must be a Callable or None")
 
+    if not isinstance(cache_max_entries, int) or cache_max_entries < 1:
+        raise ValueError("`cache_max_entries` must be a positive integer.")
+    if cache_ttl is not None and (
+        not isinstance(cache_ttl, (int, float)) or cache_ttl < 0
+    ):
+        raise ValueError(
+            "`cache_ttl` must be a non-negative number of seconds or None."
+        )
+
+    if not isinstance(deduplicate_requests, bool):
+        raise TypeError("`deduplicate_requests` must be a boolean.")
+    if batch_url is not None and not isinstance(batch_url, str):
+        raise TypeError("`batch_url` must be a string or None.")
+    if not isinstance(batch_window, (int, float)) or batch_window < 0:
+        raise ValueError("`batch_window` must be a non-negative number of seconds.")
+    if not isinstance(batch_max_requests, int) or batch_max_requests < 1:
+        raise ValueError("`batch_max_requests` must be a positive integer.")
+    if timeout is not None and (not isinstance(timeout, (int, float)) or timeout <= 0):
+        raise ValueError("`timeout` must be a positive number of seconds or None.")
+    if not isinstance(retry_attempts, int) or retry_attempts < 1:
+        raise ValueError("`retry_attempts` must be a positive integer.")
+    if not isinstance(retry_backoff, (int, float)) or retry_backoff < 0:
+        raise ValueError("`retry_backoff` must be a non-negative number of seconds.")
+    if not isinstance(retry_max_backoff, (int, float)) or retry_max_backoff < 0:
+        raise ValueError(
+            "`retry_max_backoff` must be a non-negative number of seconds."
+        )
+    if not isinstance(retry_jitter, bool):
+        raise TypeError("`retry_jitter` must be a boolean.")
+    if not isinstance(retry_after, bool):
+        raise TypeError("`retry_after` must be a boolean.")
+
+    if mode is None:
+        mode = get_setting("GENERATION_MODE")
+    if mode not in GENERATION_MODES:
+        raise ValueError("`mode` must be one of %s" % ", ".join(GENERATION_MODES))
+    if layout not in LAYOUTS:
+        raise ValueError("`layout` must be one of %s" % ", ".join(LAYOUTS))
+
+    kwargs = dict(
+        output_path=output_path,
+        api_name=api_name,
+        headers=headers,
+        csrf_token_variable_name=csrf_token_variable_name,
+        post_processor=post_processor,
+        urlpatterns=urlpatterns,
+        client_options=ClientOptions(
+            cache_max_entries=cache_max_entries,
+            cache_ttl=cache_ttl,
+            deduplicate_requests=deduplicate_requests,
+            batch_url=batch_url,
+            batch_window=batch_window,
+            batch_max_requests=batch_max_requests,
+            timeout=timeout,
+            retry_attempts=retry_attempts,
+            retry_backoff=retry_backoff,
+            retry_max_backoff=retry_max_backoff,
+            retry_jitter=retry_jitter,
+            retry_after=retry_after,
+        ),
+        layout=layout,
+    )
+
+    if _defer_depth > 0 or mode == "deferred":
+        _logger.debug("Deferring generation of the TypeScript SDK at %s", output_path)
+        deferred_targets[output_path] = kwargs
+    elif mode == "debug":
+        if settings.DEBUG and os.environ.get(DJANGO_AUTORELOAD_ENV) == "true":
+            _generate_in_background(kwargs)
+    elif mode == "background":
+        _generate_in_background(kwargs)
+    else:
+        _generate_typescript_bindings(**kwargs)
+
+
+def _generate_typescript_bindings(
+    output_path: str,
+    api_name: str,
+    headers: dict,
+    csrf_token_variable_name: Optional[str],
+    post_processor: Optional[Callable[[str], str]],
+    urlpatterns,
+    client_options: ClientOptions = ClientOptions(),
+    layout: str = "file",
+) -> None:
+    with _generation_lock:
+        _write_typescript_bindings(
+            output_path=output_path,
+            api_name=api_name,
+            headers=headers,
+            csrf_token_variable_name=csrf_token_variable_name,
+            post_processor=post_processor,
+            urlpatterns=urlpatterns,
+            client_options=client_options,
+            layout=layout,
+        )
+
+
+def _write_typescript_bindings(
+    output_path: str,
+    api_name: str,
+    headers: dict,
+    csrf_token_variable_name: Optional[str],
+    post_processor: Optional[Callable[[str], str]],
+    urlpatterns,
+    client_options: ClientOptions = ClientOptions(),
+    layout: str = "file",
+) -> None:
+    with measure_generation(output_path) as stats:
+        fingerprint = None
+        if get_setting("USE_FINGERPRINT"):
+            with _timed(stats.timings, "fingerprint"):
+                fingerprint = get_fingerprint(
+                    api_name=api_name,
+                    headers=headers,
+                    csrf_token_variable_name=csrf_token_variable_name,
+                    post_processor=post_processor,
+                    urlpatterns=urlpatterns,
+                    client_options=client_options,
+                )
+                stats.is_skipped = (
+                    read_fingerprint(get_index_path(output_path, layout)) == fingerprint
+                )
+            if stats.is_skipped:
+                _logger.debug("No changes to the inputs of %s", output_path)
+                return
+
+        render_cache = get_render_cache(
+            output_path, headers, csrf_token_variable_name, client_options
+        )
+        stream = (
+            stream_typescript_modules
+            if layout == "directory"
+            else stream_typescript_bindings
+        )
+        stats.is_written = stream(
+            output_path,
+            api_name=api_name,
+            headers=headers,
+            csrf_token_variable_name=csrf_token_variable_name,
+            post_processor=post_processor,
+            urlpatterns=urlpatterns,
+            fingerprint=fingerprint,
+            render_cache=render_cache,
+            client_options=client_options,
+            timings=stats.timings,
+            counters=stats.counters,
+        )
+        if stats.is_written:
+            _logger.debug("Changes detected, rebuilt the SDK at %s", output_path)
+        if render_cache is not None:
+            render_cache.save()
+
+
+@contextmanager
+def _timed(timings: Optional[Dict[str, float]], phase: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings[phase] = time.perf_counter() - start
+
+
+def _update_view_mappings() -> None:
+    TypeScriptInterfaceDefinition.clear()
+
     for view_mapper in DRFViewMapper.mappers:
         view_mapper.update_mappings()
 
+
+def _update_serializer_mappings() -> None:
     for serializer_mapper in DRFSerializerMapper.mappers:
         serializer_mapper.update_mappings()
 
-    # TODO: very hacky
-    url_patterns = resolve_urls(urlpatterns)
-    url_patterns_dict = {}
-    for url_pattern in url_patterns:
+
+def _get_http_methods(view_class) -> List[str]:
+    """Returns the methods of `view_class` but OPTIONS, in a fixed order, since `@api_view`
+    builds `http_method_names` from a set"""
+    return sorted(
+        (method for method in view_class.http_method_names if method != "options"),
+        key=lambda method: (
+            _HTTP_METHOD_ORDER.index(method)
+            if method in _HTTP_METHOD_ORDER
+            else len(_HTTP_METHOD_ORDER),
+            method,
+        ),
+    )
+
+
+def _get_route_index(urlpatterns) -> RouteIndex:
+    """Indexes the route of every view in `urlpatterns`, in a single pass"""
+    route_index = RouteIndex()
+    decorated_views = DecoratedViews(
+        view_mapper.view for view_mapper in DRFViewMapper.mappers
+    )
+    for _, url_pattern, prefixes in resolve_urls(
+        urlpatterns,
+        should_include=decorated_views.should_include,
+        excluded_namespaces=get_setting("EXCLUDED_URL_NAMESPACES"),
+        should_descend=decorated_views.should_descend,
+    ):
+        callback = url_pattern.callback
+        ts_path, ts_args = translate_url(prefixes, url_pattern.pattern)
+
         # ViewSets
-        if hasattr(url_pattern.url_pattern.callback, "actions") and isinstance(
-            url_pattern.url_pattern.callback.actions, dict
-        ):
-            for method, func in url_pattern.url_pattern.callback.actions.items():
-                # print(getattr(url_pattern.url_pattern.callback.cls, "__name__"), value.view.__qualname__)
-                if hasattr(url_pattern.url_pattern.pattern, "_route"):
-                    path = str(url_pattern.url_pattern.pattern._route)
-                    re_pattern = r"\<[A-Za-z0-9_]+\:([A-Za-z0-9_]+)\>"
-                    re_path = re.sub(re_pattern, r"${\1}", path)
-                else:
-                    path = str(url_pattern.url_pattern.pattern._regex)
-                    re_pattern = r"\(\?P\<([A-Za-z0-9_]+)\>.+?\)\/"
-                    re_path = re.sub(re_pattern, r"${\1}/", path)
-                    re_pattern = r"\(\?P\<([A-Za-z0-9_]+)\>.+?\)\$"
-                    re_path = re.sub(re_pattern, r"${\1}", re_path)
-                    if re_path[0] == "^":
-                        re_path = re_path[1:]
-                    if re_path[-1] == "$":
-                        re_path = re_path[:-1]
-                quote = '"' if path == re_path else "`"
-                ts_path = f"{quote}/{str(url_pattern.base_url)}{re_path}{quote}"
-                ts_method = method.upper()
-                ts_args = re.findall(r"\$\{(.*?)\}", re_path)
-                url_patterns_dict[
-                    inspect.getmodule(url_pattern.url_pattern.callback).__name__
-                    + ":"
-                    + getattr(
-                        getattr(url_pattern.url_pattern.callback.cls, func),
-                        "__qualname__",
-                    )
-                ] = (ts_path, ts_method, ts_args, url_pattern.url_pattern.callback)
-                url_patterns_dict[str(url_pattern.url_pattern.callback)] = (
-                    ts_path,
-                    ts_method,
-                    ts_args,
-                    url_pattern.url_pattern.callback,
+        if hasattr(callback, "actions") and isinstance(callback.actions, dict):
+            for method, func in callback.actions.items():
+                route_index.add(
+                    Route(ts_path, method.upper(), ts_args, callback),
+                    module=callback.__module__,
+                    name=getattr(getattr(callback.cls, func), "__qualname__"),
+                    view_class=callback.cls,
                 )
-        # APIViews
-        elif hasattr(
-            url_pattern.url_pattern.callback, "view_class"
-        ) and "WrappedAPIView" not in str(url_pattern.url_pattern.callback):
-            actions = {
-                k: v
-                for k, v in url_pattern.url_pattern.callback.view_class.__dict__.items()
-                if callable(v)
-            }
-            for method, func in actions.items():
-                if hasattr(url_pattern.url_pattern.pattern, "_route"):
-                    path = str(url_pattern.url_pattern.pattern._route)
-                    re_pattern = r"\<[A-Za-z0-9_]+\:([A-Za-z0-9_]+)\>"
-                    re_path = re.sub(re_pattern, r"${\1}", path)
-                else:
-                    path = str(url_pattern.url_pattern.pattern._regex)
-                    re_pattern = r"\(\?P\<([A-Za-z0-9_]+)\>.+?\)\/"
-                    re_path = re.sub(re_pattern, r"${\1}/", path)
-                    re_pattern = r"\(\?P\<([A-Za-z0-9_]+)\>.+?\)\$"
-                    re_path = re.sub(re_pattern, r"${\1}", re_path)
-                    if re_path[0] == "^":
-                        re_path = re_path[1:]
-                    if re_path[-1] == "$":
-                        re_path = re_path[:-1]
-                quote = '"' if path == re_path else "`"
-                ts_path = f"{quote}/{str(url_pattern.base_url)}{re_path}{quote}"
-                ts_method = method.upper()
-                ts_args = re.findall(r"\$\{(.*?)\}", re_path)
-                url_patterns_dict[
-                    inspect.getmodule(url_pattern.url_pattern.callback).__name__
-                    + ":"
-                    + getattr(
-                        getattr(url_pattern.url_pattern.callback.view_class, method),
-                        "__qualname__",
+        # APIViews and @api_views
+        elif hasattr(callback, "view_class"):
+            handlers = set()
+            for method in _get_http_methods(callback.view_class):
+                func = callback.view_class.__dict__.get(method)
+                # `@api_view` binds the same function to each of its methods, which is routed
+                # with the first of them
+                if callable(func) and func not in handlers:
+                    handlers.add(func)
+                    route_index.add(
+                        Route(ts_path, method.upper(), ts_args, callback),
+                        module=callback.__module__,
+                        name=func.__qualname__,
+                        view_class=callback.view_class,
                     )
-                ] = (ts_path, ts_method, ts_args, url_pattern.url_pattern.callback)
-                url_patterns_dict[str(url_pattern.url_pattern.callback)] = (
-                    ts_path,
-                    ts_method,
-                    ts_args,
-                    url_pattern.url_pattern.callback,
-                )
-        # @api_views
-        elif hasattr(url_pattern.url_pattern.callback, "cls"):
-            if hasattr(url_pattern.url_pattern.pattern, "_route"):
-                path = str(url_pattern.url_pattern.pattern._route)
-                re_pattern = r"\<[A-Za-z0-9_]+\:([A-Za-z0-9_]+)\>"
-                re_path = re.sub(re_pattern, r"${\1}", path)
-            else:
-                path = str(url_pattern.url_pattern.pattern._regex)
-                re_pattern = r"\(\?P\<([A-Za-z0-9_]+)\>.+?\)\/"
-                re_path = re.sub(re_pattern, r"${\1}/", path)
-                re_pattern = r"\(\?P\<([A-Za-z0-9_]+)\>.+?\)\$"
-                re_path = re.sub(re_pattern, r"${\1}", re_path)
-                if re_path[0] == "^":
-                    re_path = re_path[1:]
-                if re_path[-1] == "$":
-                    re_path = re_path[:-1]
-            quote = '"' if path == re_path else "`"
-            ts_path = f"{quote}/{str(url_pattern.base_url)}{re_path}{quote}"
-            ts_method = next(
-                iter(
-                    [
-                        x
-                        for x in url_pattern.url_pattern.callback.cls.http_method_names
-                        if x != "options"
-                    ]
-                ),
-                "get",
-            ).upper()
-            ts_args = re.findall(r"\$\{(.*?)\}", re_path)
-            url_patterns_dict[
-                inspect.getmodule(url_pattern.url_pattern.callback).__name__
-                + ":"
-                + url_pattern.url_pattern.callback.__name__
-            ] = (ts_path, ts_method, ts_args, url_pattern.url_pattern.callback)
-            url_patterns_dict[str(url_pattern.url_pattern.callback)] = (
-                ts_path,
-                ts_method,
-                ts_args,
-                url_pattern.url_pattern.callback,
-            )
 
-    # print(url_patterns_dict)
-    # return
-    # print([{
-    #         'pattern': {
-    #             'route': p.url_pattern.pattern._route,
-    #             'regex_dict': p.url_pattern.pattern._regex_dict,
-    #             'is_endpoint': p.url_pattern.pattern._is_endpoint,
-    #             'name': p.url_pattern.pattern.name,
-    #             'converters': p.url_pattern.pattern.converters
-    #         },
-    #         'callback': p.url_pattern.callback,
-    #         'callbackdict': p.url_pattern.callback.__dict__,
-    #         'default_args': p.url_pattern.default_args,
-    #         'name': p.url_pattern.name
-    #     } for p in url_patterns])
-    # return
-
-    _logger.debug("Getting current TypeScript SDK")
-    mode = "w"
-    if os.path.exists(output_path):
-        mode = "r+"
-    with open(output_path, mode) as output_file:
-        if mode == "r+":
-            current_text = output_file.read()
-        typescript_bindings_text = _get_typescript_bindings(
+    return route_index
+
+
+def _prepare_generation(urlpatterns, timings: Optional[Dict[str, float]]) -> RouteIndex:
+    with _timed(timings, "url_resolution"):
+        route_index = _get_route_index(urlpatterns)
+
+    with _timed(timings, "view_mapping"):
+        _update_view_mappings()
+
+    with _timed(timings, "interface_building"):
+        _update_serializer_mappings()
+    return route_index
+
+
+def _collect_counters(
+    timings: Optional[Dict[str, float]],
+    counters: Optional[Dict[str, int]],
+    route_index: RouteIndex,
+    render_cache: Optional[RenderCache],
+    bytes_written: int,
+) -> None:
+    if timings is not None:
+        timings[
+            "serializer_introspection"
+        ] = TypeScriptInterfaceDefinition.introspection_seconds
+    if counters is None:
+        return
+    counters["routes_scanned"] = route_index.routes_scanned
+    counters[
+        "serializers_introspected"
+    ] = TypeScriptInterfaceDefinition.serializers_introspected
+    counters[
+        "definition_cache_hits"
+    ] = TypeScriptInterfaceDefinition.definition_cache_hits
+    counters[
+        "definition_cache_misses"
+    ] = TypeScriptInterfaceDefinition.definition_cache_misses
+    if render_cache is not None:
+        counters["render_cache_hits"] = render_cache.hits
+        counters["render_cache_misses"] = render_cache.misses
+    counters["bytes_written"] = bytes_written
+
+
+def emit_typescript_bindings(
+    sink: Union[TextIO, TypeScriptEmitter, None],
+    api_name: str,
+    headers: dict,
+    csrf_token_variable_name: Optional[str],
+    post_processor: Optional[Callable[[str], str]],
+    urlpatterns,
+    timings: Optional[Dict[str, float]] = None,
+    fingerprint: Optional[str] = None,
+    render_cache: Optional[RenderCache] = None,
+    client_options: ClientOptions = ClientOptions(),
+    counters: Optional[Dict[str, int]] = None,
+) -> TypeScriptEmitter:
+    """Writes the TypeScript API Client to `sink`, any text file-like object, without holding the
+    whole text in memory unless `post_processor` is a custom one. The interfaces and endpoints
+    are rendered twice: once to find the inline types they repeat, then as they are written.
+    Returns the emitter, which holds the hash and the size of the output.
+
+    :param TextIO sink: If `None`, the output is only hashed. May also be an emitter, which is returned.
+    :param dict timings: If provided, the duration in seconds of each phase ("url_resolution",
+        "view_mapping", "interface_building" and "rendering") is stored in it, along with the time
+        spent introspecting serializers during the last two ("serializer_introspection").
+    :param str fingerprint: If provided, stored in a comment at the top of the client (see `get_fingerprint`).
+    :param RenderCache render_cache: If provided, only the interfaces and endpoints which changed since
+        the cache was saved are rendered.
+    :param ClientOptions client_options: The options of the client's runtime.
+    :param dict counters: If provided, the number of routes scanned ("routes_scanned"), of
+        serializers introspected ("serializers_introspected"), of hits and misses of the
+        definitions cache ("definition_cache_hits", "definition_cache_misses") and of the render
+        cache, and of bytes written ("bytes_written") are stored in it.
+    """
+    route_index = _prepare_generation(urlpatterns, timings)
+
+    with _timed(timings, "rendering"):
+        emitter = (
+            sink if isinstance(sink, TypeScriptEmitter) else TypeScriptEmitter(sink)
+        )
+        _emit_typescript_bindings(
+            emitter,
             api_name=api_name,
             headers=headers,
             csrf_token_variable_name=csrf_token_variable_name,
             post_processor=post_processor,
-            url_patterns=url_patterns_dict,
+            route_index=route_index,
+            fingerprint=fingerprint,
+            render_cache=render_cache,
+            client_options=client_options,
         )
-        prettified = (
-            typescript_bindings_text  # jsbeautifier.beautify(typescript_bindings_text)
+    _collect_counters(
+        timings, counters, route_index, render_cache, emitter.bytes_written
+    )
+    return emitter
+
+
+def build_typescript_bindings(**kwargs) -> str:
+    """Returns the text of the TypeScript API Client. Takes the same arguments as
+    `emit_typescript_bindings`, except for `sink`."""
+    buffer = io.StringIO()
+    emit_typescript_bindings(buffer, **kwargs)
+    return buffer.getvalue()
+
+
+def stream_typescript_bindings(output_path: str, **kwargs) -> bool:
+    """Writes the TypeScript API Client to a temporary file next to `output_path`, which replaces
+    `output_path` only if its hash differs. Takes the same arguments as `emit_typescript_bindings`,
+    except for `sink`. Returns `True` if the file was written."""
+    output = AtomicOutput(output_path)
+    with output as emitter:
+        emit_typescript_bindings(emitter, **kwargs)
+    if kwargs.get("timings") is not None:
+        kwargs["timings"]["writing"] = output.exit_seconds
+    return output.changed
+
+
+def emit_typescript_modules(
+    open_module: Callable[[str], ContextManager[TypeScriptEmitter]],
+    api_name: str,
+    headers: dict,
+    csrf_token_variable_name: Optional[str],
+    post_processor: Optional[Callable[[str], str]],
+    urlpatterns,
+    timings: Optional[Dict[str, float]] = None,
+    fingerprint: Optional[str] = None,
+    render_cache: Optional[RenderCache] = None,
+    client_options: ClientOptions = ClientOptions(),
+    counters: Optional[Dict[str, int]] = None,
+) -> List[str]:
+    """Writes the TypeScript API Client as several modules: "runtime", "types" (the interfaces),
+    one per top-level namespace of the API, "lazy", which imports them dynamically, and "index",
+    which exports them. Each module is written
+    to the emitter returned by the context manager `open_module(name)`, and is processed by
+    `post_processor` on its own. Takes the same other arguments as `emit_typescript_bindings`.
+    Returns the namespaces."""
+    route_index = _prepare_generation(urlpatterns, timings)
+    emitters = []
+
+    @contextmanager
+    def open_counted_module(name: str):
+        with open_module(name) as emitter:
+            emitters.append(emitter)
+            yield emitter
+
+    with _timed(timings, "rendering"):
+        namespaces = _emit_typescript_modules(
+            open_counted_module,
+            api_name=api_name,
+            headers=headers,
+            csrf_token_variable_name=csrf_token_variable_name,
+            post_processor=post_processor,
+            route_index=route_index,
+            fingerprint=fingerprint,
+            render_cache=render_cache,
+            client_options=client_options,
+        )
+    _collect_counters(
+        timings,
+        counters,
+        route_index,
+        render_cache,
+        sum(emitter.bytes_written for emitter in emitters),
+    )
+    return namespaces
+
+
+def get_index_path(output_path: str, layout: str = "file") -> str:
+    """Returns the path of the file of the client generated at `output_path` which holds its fingerprint"""
+    if layout == "directory":
+        return os.path.join(output_path, _INDEX_MODULE + ".ts")
+    return output_path
+
+
+def _read_namespaces(output_dir: str) -> List[str]:
+    """Returns the namespaces exported by the index in `output_dir`"""
+    index_path = get_index_path(output_dir, "directory")
+    if not os.path.exists(index_path):
+        return []
+    with open(index_path, "r", encoding="utf-8") as index_file:
+        return _NAMESPACE_EXPORT_RE.findall(index_file.read())
+
+
+def _get_removed_namespace_paths(
+    output_dir: str, previous_namespaces: List[str], namespaces: List[str]
+) -> List[str]:
+    """Returns the paths of the existing modules of `previous_namespaces` which are not among `namespaces`"""
+    return [
+        path
+        for path in (
+            os.path.join(output_dir, namespace + ".ts")
+            for namespace in previous_namespaces
+            if namespace not in namespaces
         )
-        if mode == "w" or current_text.strip() != prettified.strip():
-            _logger.debug("Changes detected, rebuilding the SDK")
-            if mode == "r+":
-                output_file.seek(0)
-                output_file.truncate()
-            output_file.write(prettified)
-            output_file.close()
+        if os.path.exists(path)
+    ]
+
+
+def stream_typescript_modules(output_dir: str, **kwargs) -> bool:
+    """Writes the TypeScript API Client as modules in `output_dir` (see `emit_typescript_modules`),
+    each of which replaces the existing one only if its hash differs, and removes the modules of the
+    namespaces which no longer exist. Takes the same arguments as `emit_typescript_modules`, except
+    for `open_module`. Returns `True` if a file was written or removed."""
+    os.makedirs(output_dir, exist_ok=True)
+    previous_namespaces = _read_namespaces(output_dir)
+    outputs = []
+
+    def open_module(name: str) -> AtomicOutput:
+        outputs.append(AtomicOutput(os.path.join(output_dir, name + ".ts")))
+        return outputs[-1]
+
+    namespaces = emit_typescript_modules(open_module, **kwargs)
+    start = time.perf_counter()
+    removed_paths = _get_removed_namespace_paths(
+        output_dir, previous_namespaces, namespaces
+    )
+    for path in removed_paths:
+        _logger.debug("Removing %s", path)
+        os.remove(path)
+    timings = kwargs.get("timings")
+    if timings is not None:
+        # each module is compared and replaced as soon as it is rendered
+        writing = sum(output.exit_seconds for output in outputs)
+        timings["rendering"] -= writing
+        timings["writing"] = writing + time.perf_counter() - start
+    return bool(removed_paths) or any(output.changed for output in outputs)
+
+
+def get_stale_modules(output_dir: str, **kwargs) -> List[str]:
+    """Returns the paths of the modules in `output_dir` which are out of date, or which would be
+    removed, without writing any. Takes the same arguments as `stream_typescript_modules`."""
+    digests = {}
+
+    @contextmanager
+    def open_module(name: str):
+        # only the hash of the output is needed
+        emitter = TypeScriptEmitter()
+        yield emitter
+        digests[os.path.join(output_dir, name + ".ts")] = emitter.hexdigest()
+
+    namespaces = emit_typescript_modules(open_module, **kwargs)
+    return [
+        path for path, digest in digests.items() if get_file_digest(path) != digest
+    ] + _get_removed_namespace_paths(
+        output_dir, _read_namespaces(output_dir), namespaces
+    )
+
+
+def is_stale(output_path: str, typescript_bindings_text: str) -> bool:
+    """Returns `True` if the file at `output_path` does not contain `typescript_bindings_text`"""
+    emitter = TypeScriptEmitter()
+    emitter.write(typescript_bindings_text)
+    return get_file_digest(output_path) != emitter.hexdigest()
+
+
+def write_typescript_bindings(output_path: str, typescript_bindings_text: str) -> bool:
+    """Writes `typescript_bindings_text` to `output_path` if it changed. Returns `True` if the file was written."""
+    output = AtomicOutput(output_path)
+    with output as emitter:
+        emitter.write(typescript_bindings_text)
+    return output.changed
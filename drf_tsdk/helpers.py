@@ -1,11 +1,14 @@
 import logging
 import re
+import time
 from typing import Optional, Type
 
 from django.conf import settings
 
 from rest_framework import serializers
 
+from .inline_types import mark_inline_type, unmark_inline_types
+
 _logger = logging.getLogger(__name__)
 
 
@@ -40,6 +43,39 @@ if hasattr(settings, "DRF_TSDK"):
             SERIALIZER_FIELD_MAPPINGS[k] = v
 
 
+_serializer_fields = (
+    dict()
+)  # the fields of each serializer class, see `get_serializer_fields`
+
+
+def get_serializer_fields(serializer_class) -> dict:
+    """Returns the fields of a serializer class without calling its `__init__`, which may be
+    expensive or have side effects. The result is cached per class.
+
+    Serializers which don't override `get_fields` only have their declared fields. Otherwise,
+    as for `ModelSerializer`, which builds its fields from the model's metadata, `get_fields`
+    is called on an instance which was never initialized, since it only relies on class-level
+    configuration. If that fails, the serializer is instantiated as a last resort.
+    """
+    fields = _serializer_fields.get(serializer_class)
+    if fields is not None:
+        return fields
+
+    if serializer_class.get_fields is serializers.Serializer.get_fields:
+        fields = serializer_class._declared_fields
+    else:
+        try:
+            fields = serializer_class.__new__(serializer_class).get_fields()
+        except Exception:
+            _logger.debug(
+                "Instantiating '%s' to get its fields", serializer_class.__name__
+            )
+            fields = serializer_class().get_fields()
+
+    _serializer_fields[serializer_class] = fields
+    return fields
+
+
 class TypeScriptPropertyDefinition:
     def __init__(
         self,
@@ -53,7 +89,9 @@ class TypeScriptPropertyDefinition:
         comment=None,
     ):
         self.name = name
-        self.ts_type = ts_type
+        # `ts_type` may embed the marked inline types of serializers, which `self.ts_type` leaves out
+        self._marked_ts_type = ts_type
+        self.ts_type = unmark_inline_types(ts_type)
         self.is_optional = is_optional
         self.is_nullable = is_nullable
         self.is_many = is_many
@@ -68,6 +106,11 @@ class TypeScriptPropertyDefinition:
         return self.name
 
     def ts_definition_string(self, method: str = "read") -> Optional[str]:
+        ret = self._get_marked_ts_definition_string(method)
+        return None if ret is None else unmark_inline_types(ret)
+
+    def _get_marked_ts_definition_string(self, method: str = "read") -> Optional[str]:
+        """Returns the definition of the property, with its inline types marked for `InlineTypeAliases`"""
         if self.is_readonly and method == "write":
             return None
         if self.is_writeonly and method == "read":
@@ -81,7 +124,7 @@ class TypeScriptPropertyDefinition:
             self._format_name()
             + ("?" if self.is_optional else "")
             + ": "
-            + self.ts_type
+            + self._marked_ts_type
             + ("[]" if self.is_many else "")
             + (" | null" if self.is_nullable else "")
         )
@@ -96,15 +139,55 @@ class TypeScriptEndpointDefinition:
         query_serializer=None,
         body_serializer=None,
         response_serializer=None,
+        cache_ttl=None,
+        deduplicate=None,
+        provides=None,
+        invalidates=None,
+        stale_while_revalidate=False,
+        latest_wins=False,
+        retry=None,
+        stream=None,
+        paginated=False,
     ):
         self.view = view
         self.description = description
         self.query_serializer = query_serializer
         self.body_serializer = body_serializer
         self.response_serializer = response_serializer
+        self.cache_ttl = cache_ttl
+        self.deduplicate = deduplicate
+        self.provides = provides
+        self.invalidates = invalidates
+        self.stale_while_revalidate = stale_while_revalidate
+        self.latest_wins = latest_wins
+        self.retry = retry
+        self.stream = stream
+        self.paginated = paginated
 
 
 class TypeScriptInterfaceDefinition:
+
+    definitions = (
+        dict()
+    )  # definitions shared by every reference to the same serializer, keyed by `_get_definition_key`
+
+    _properties_by_serializer = (
+        dict()
+    )  # the introspected fields of each serializer class, keyed by (serializer class, method)
+
+    _definition_strings = (
+        dict()
+    )  # memoized results of `ts_definition_string`, keyed by (definition, method, is_interface_definition)
+
+    # the counters of the current generation, reset by `clear`
+    definition_cache_hits = 0
+    definition_cache_misses = 0
+    serializers_introspected = 0
+    introspection_seconds = 0.0
+    _introspection_depth = (
+        0  # introspecting a serializer may introspect the ones nested in it
+    )
+
     def __init__(
         self,
         serializer: Type[serializers.Serializer],
@@ -122,32 +205,135 @@ class TypeScriptInterfaceDefinition:
             self.is_many = True
             # print("LIST SERIALIZER CHILD: ", str(_serializer))
 
-        if not isinstance(serializer_, serializers.Serializer):
-            serializer_ = serializer_()
+        # serializer classes are introspected without being instantiated; see `get_serializer_fields`
+        self.serializer_class = (
+            serializer_ if isinstance(serializer_, type) else serializer_.__class__
+        )
 
         self.property_definition = property_definition
         self.serializer = serializer_
-        self.name = name or serializer_.__class__.__name__
+        self.name = name or self.serializer_class.__name__
         if re.search(r"[^0-9A-Za-z_]", self.name):
             self.name = '"%s"' % self.name.replace('"', '\\"')
         self.should_export = should_export
-        self.properties = self._get_interface_definition()
         self.method = method
+        self._properties = None
+
+    @property
+    def properties(self):
+        # built lazily, so that definitions whose TypeScript is cached are never introspected
+        if self._properties is None:
+            key = (self.serializer_class, self.method)
+            properties = TypeScriptInterfaceDefinition._properties_by_serializer.get(
+                key
+            )
+            if properties is None:
+                properties = self._introspect()
+                TypeScriptInterfaceDefinition._properties_by_serializer[
+                    key
+                ] = properties
+            self._properties = properties
+        return self._properties
+
+    def _introspect(self):
+        cls = TypeScriptInterfaceDefinition
+        cls.serializers_introspected += 1
+        cls._introspection_depth += 1
+        start = time.perf_counter()
+        try:
+            return self._get_interface_definition()
+        finally:
+            cls._introspection_depth -= 1
+            if cls._introspection_depth == 0:
+                cls.introspection_seconds += time.perf_counter() - start
+
+    @staticmethod
+    def _get_definition_key(serializer, name, should_export, method) -> tuple:
+        is_many = isinstance(serializer, serializers.ListSerializer)
+        if is_many:
+            serializer = serializer.child
+        return (
+            serializer if isinstance(serializer, type) else serializer.__class__,
+            is_many,
+            name,
+            should_export,
+            method,
+        ) + tuple(
+            getattr(serializer, attr, None)
+            for attr in ("help_text", "read_only", "write_only", "required")
+        )
+
+    @classmethod
+    def get(
+        cls,
+        serializer: Type[serializers.Serializer],
+        name: Optional[str] = None,
+        should_export: bool = True,
+        method: str = "read",
+    ) -> "TypeScriptInterfaceDefinition":
+        """Returns the definition of `serializer`, which is only built once per generation
+        for every combination of serializer class and flags."""
+        key = cls._get_definition_key(serializer, name, should_export, method)
+        definition = cls.definitions.get(key)
+        if definition is not None:
+            cls.definition_cache_hits += 1
+        else:
+            cls.definition_cache_misses += 1
+            definition = cls(
+                serializer, name=name, should_export=should_export, method=method
+            )
+            cls.definitions[key] = definition
+        return definition
+
+    @classmethod
+    def clear(cls) -> None:
+        """Forgets every shared definition, so that the next generation introspects serializers again"""
+        cls.definitions = dict()
+        cls._properties_by_serializer = dict()
+        cls._definition_strings = dict()
+        cls.definition_cache_hits = 0
+        cls.definition_cache_misses = 0
+        cls.serializers_introspected = 0
+        cls.introspection_seconds = 0.0
+        _serializer_fields.clear()
 
     def ts_definition_string(
         self, method: str = "read", is_interface_definition: bool = False
+    ) -> str:
+        return unmark_inline_types(
+            self._get_marked_ts_definition_string(
+                method=method, is_interface_definition=is_interface_definition
+            )
+        )
+
+    def _get_marked_ts_definition_string(
+        self, method: str = "read", is_interface_definition: bool = False
+    ) -> str:
+        """Returns `ts_definition_string`, with its inline object types marked, so that
+        `InlineTypeAliases` can alias the ones repeated across the client"""
+        key = (self, method, is_interface_definition)
+        ret = TypeScriptInterfaceDefinition._definition_strings.get(key)
+        if ret is None:
+            ret = self._get_ts_definition_string(
+                method=method, is_interface_definition=is_interface_definition
+            )
+            TypeScriptInterfaceDefinition._definition_strings[key] = ret
+        return ret
+
+    def _get_ts_definition_string(
+        self, method: str = "read", is_interface_definition: bool = False
     ) -> str:
         from .drf_to_ts import DRFSerializerMapper
 
         if (
             method == "read"
             and not is_interface_definition
-            and self.serializer.__class__ in DRFSerializerMapper.mappings.keys()
+            and self.serializer_class in DRFSerializerMapper.mappings.keys()
         ):
             ret = ""
             if hasattr(self.serializer, "help_text") and self.serializer.help_text:
                 ret = f"/** {self.serializer.help_text} */\n"
-            name = DRFSerializerMapper.mappings[self.serializer.__class__].name
+            name = DRFSerializerMapper.mappings[self.serializer_class].name
             ret += name + ("[]" if self.is_many else "")
             return ret
 
@@ -169,8 +355,7 @@ class TypeScriptInterfaceDefinition:
                     continue
 
                 if (
-                    property_.serializer.__class__
-                    in DRFSerializerMapper.mappings.keys()
+                    property_.serializer_class in DRFSerializerMapper.mappings.keys()
                     and method == "read"
                 ):
                     ret = ""
@@ -179,9 +364,7 @@ class TypeScriptInterfaceDefinition:
                         and self.serializer.help_text
                     ):
                         ret = f"/** {self.serializer.help_text} */\n"
-                    name = DRFSerializerMapper.mappings[
-                        property_.serializer.__class__
-                    ].name
+                    name = DRFSerializerMapper.mappings[property_.serializer_class].name
                     ret += (
                         property_.name
                         + ("?" if property_.property_definition.is_optional else "")
@@ -211,7 +394,7 @@ class TypeScriptInterfaceDefinition:
                         property_.name
                         + ("?" if not_required else "")
                         + ": "
-                        + property_.ts_definition_string(method=method)
+                        + property_._get_marked_ts_definition_string(method=method)
                         + ("[]" if property_.property_definition.is_many else "")
                         + (
                             " | null"
@@ -221,8 +404,10 @@ class TypeScriptInterfaceDefinition:
                     )
                     property_strings.append(ret)
             else:
-                property_strings.append(property_.ts_definition_string(method=method))
-        return (
+                property_strings.append(
+                    property_._get_marked_ts_definition_string(method=method)
+                )
+        body = (
             "{"
             + ",\n".join(
                 [
@@ -233,6 +418,10 @@ class TypeScriptInterfaceDefinition:
             )
             + "}"
         )
+        if is_interface_definition:
+            return body
+        # replaced by a type alias if it occurs more than once; see `InlineTypeAliases`
+        return mark_inline_type(self.serializer_class.__name__, method, body)
 
     def _get_interface_definition(self) -> Type[TypeScriptPropertyDefinition]:
         """
@@ -242,16 +431,10 @@ class TypeScriptInterfaceDefinition:
         :return: An InterfaceDefinition instance
         """
 
-        if hasattr(self.serializer, "get_fields"):
-            _logger.debug(
-                "Getting serializer definition for '%s'", type(self.serializer).__name__
-            )
-            drf_fields = self.serializer.get_fields().items()
-        else:
-            _logger.debug(
-                "Getting serializer definition for '%s'", self.serializer.__name__
-            )
-            drf_fields = self.serializer._declared_fields.items()
+        _logger.debug(
+            "Getting serializer definition for '%s'", self.serializer_class.__name__
+        )
+        drf_fields = get_serializer_fields(self.serializer_class).items()
 
         properties = []
         for key, value in drf_fields:
@@ -327,30 +510,30 @@ class TypeScriptInterfaceDefinition:
             and field.child
         ):
             if isinstance(field.child, serializers.ListSerializer):
-                definition = TypeScriptInterfaceDefinition(
+                definition = TypeScriptInterfaceDefinition.get(
                     serializer=field.child,
                     should_export=False,
                     method="read" if not hasattr(self, "method") else self.method,
                 )
                 child_type = (
-                    definition.ts_definition_string(
+                    definition._get_marked_ts_definition_string(
                         method="read" if not hasattr(self, "method") else self.method
                     )
                     + "[]"
                 )
             elif isinstance(field.child, serializers.Serializer):
-                definition = TypeScriptInterfaceDefinition(
+                definition = TypeScriptInterfaceDefinition.get(
                     serializer=field.child,
                     should_export=False,
                     method="read" if not hasattr(self, "method") else self.method,
                 )
-                child_type = definition.ts_definition_string(
+                child_type = definition._get_marked_ts_definition_string(
                     method="read" if not hasattr(self, "method") else self.method
                 )
             else:
                 child_type = self._get_property_definition(
                     name="dummy", field=field.child
-                ).ts_type
+                )._marked_ts_type
             ts_type = f"{{ [key: string] : {child_type} }}"
 
         return TypeScriptPropertyDefinition(
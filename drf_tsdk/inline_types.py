@@ -0,0 +1,151 @@
+import logging
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+_logger = logging.getLogger(f"drf-tsdk.{__name__}")
+
+# delimit the inline object types in rendered fragments, which never contain these characters
+_START = "\x02"
+_NAME_END = "\x1f"
+_END = "\x03"
+_MARKER_RE = re.compile("[%s%s]" % (_START, _END))
+_MARKS_RE = re.compile(
+    "%s[^%s]*%s[^%s]*%s|%s" % ((_START,) + (_NAME_END,) * 4 + (_END,))
+)
+
+
+def mark_inline_type(name: str, method: str, body: str) -> str:
+    """Returns the object type `body` of the serializer class `name` for `method` ("read" or
+    "write"), marked so that `InlineTypeAliases` can find it in the fragments it is part of"""
+    return _START + name + _NAME_END + method + _NAME_END + body + _END
+
+
+def unmark_inline_types(text: str) -> str:
+    """Returns `text` with the marks of its inline types removed"""
+    if _START not in text:
+        return text
+    return _MARKS_RE.sub("", text)
+
+
+def _parse(marked: str) -> Tuple[str, str, str]:
+    """Returns the name, method and body of the text between the marks of an inline type"""
+    name_end = marked.index(_NAME_END)
+    method_end = marked.index(_NAME_END, name_end + 1)
+    return (
+        marked[:name_end],
+        marked[name_end + 1 : method_end],
+        marked[method_end + 1 :],
+    )
+
+
+class InlineTypeAliases:
+    """Finds the inline object types occurring more than once in the rendered `fragments`, from
+    the same serializer or not, and names each of them with a type alias, e.g.
+    `type _InnerFooSerializer = {...}`, which `resolve` substitutes for it. An alias is named after
+    the first serializer found with its type, and ends with `Read` or `Write` if the type is only
+    used for that method. A type nested in an aliased one is counted once for the alias, rather
+    than once per use of it. `fragments` is only iterated once, so it may render them lazily.
+    """
+
+    def __init__(self, fragments: Iterable[str], reserved_names: Iterable[str] = ()):
+        # keyed by body
+        self._names: Dict[str, str] = {}  # the first serializer found with each type
+        self._methods: Dict[str, set] = {}  # the methods each type is used for
+        self._children: Dict[str, Counter] = {}  # types directly nested in each type
+        self._top_level_uses = Counter()  # uses outside of any other inline type
+        for fragment in fragments:
+            self._scan(fragment)
+
+        self.aliases: Dict[str, str] = {}
+        self._resolved: Dict[str, str] = {}
+        self._assign_aliases(set(reserved_names))
+        _logger.debug(
+            "Aliased %d of %d inline types", len(self.aliases), len(self._methods)
+        )
+
+    def _scan(self, fragment: str) -> None:
+        stack: List[tuple] = []  # (start of the marked text, nested types)
+        for match in _MARKER_RE.finditer(fragment):
+            if match.group() == _START:
+                stack.append((match.end(), Counter()))
+                continue
+            start, children = stack.pop()
+            name, method, body = _parse(fragment[start : match.start()])
+            if body not in self._methods:
+                self._names[body] = name
+                self._methods[body] = set()
+                self._children[body] = children
+            self._methods[body].add(method)
+            if stack:
+                stack[-1][1][body] += 1
+            else:
+                self._top_level_uses[body] += 1
+
+    def _assign_aliases(self, reserved_names: set) -> None:
+        parents: Dict[str, List[tuple]] = {body: [] for body in self._methods}
+        for body, children in self._children.items():
+            for child, count in children.items():
+                parents[child].append((body, count))
+
+        # a body is longer than the bodies nested in it, so that its uses are known before theirs
+        uses: Dict[str, int] = {}
+        aliased = set()
+        for body in sorted(self._methods, key=len, reverse=True):
+            uses[body] = self._top_level_uses[body] + sum(
+                count * (1 if parent in aliased else uses[parent])
+                for parent, count in parents[body]
+            )
+            if uses[body] > 1:
+                aliased.add(body)
+
+        # named in the order the types were first found, i.e. nested ones first
+        for body, methods in self._methods.items():
+            if body not in aliased:
+                continue
+            name = "_" + self._names[body]
+            if len(methods) == 1:
+                name += next(iter(methods)).capitalize()
+            alias = name
+            suffix = 1
+            while alias in reserved_names:
+                suffix += 1
+                alias = "%s%d" % (name, suffix)
+            reserved_names.add(alias)
+            self.aliases[body] = alias
+
+    def _resolve_body(self, body: str) -> str:
+        ret = self._resolved.get(body)
+        if ret is None:
+            ret = self._resolved[body] = self.resolve(body)
+        return ret
+
+    def resolve(self, text: str) -> str:
+        """Returns `text` with each inline type replaced by its alias, or unmarked"""
+        if _START not in text:
+            return text
+        ret = []
+        position = 0
+        depth = 0
+        for match in _MARKER_RE.finditer(text):
+            if match.group() == _START:
+                if depth == 0:
+                    ret.append(text[position : match.start()])
+                    start = match.end()
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 0:
+                _, _, body = _parse(text[start : match.start()])
+                alias = self.aliases.get(body)
+                ret.append(alias if alias is not None else self._resolve_body(body))
+                position = match.end()
+        ret.append(text[position:])
+        return "".join(ret)
+
+    def get_declarations_text(self) -> str:
+        """Returns the declarations of the aliases"""
+        return "\n\n".join(
+            f"type {alias} = {self._resolve_body(body)};"
+            for body, alias in self.aliases.items()
+        )
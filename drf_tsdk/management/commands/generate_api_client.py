@@ -1,13 +1,253 @@
+import sys
+from importlib import import_module, reload
+
+from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
+from django.urls import clear_url_caches
+
+from drf_tsdk.drf_to_ts import DRFSerializerMapper, DRFViewMapper
+from drf_tsdk.emitter import get_file_digest
+from drf_tsdk.fingerprint import get_fingerprint, read_fingerprint
+from drf_tsdk.generate_typescript_bindings import (
+    LAYOUTS,
+    _default_processor,
+    _timed,
+    defer_generation,
+    deferred_targets,
+    emit_typescript_bindings,
+    get_index_path,
+    get_stale_modules,
+    stream_typescript_bindings,
+    stream_typescript_modules,
+)
+from drf_tsdk.instrumentation import measure_generation
+from drf_tsdk.render_cache import get_render_cache
+from drf_tsdk.runtime import ClientOptions
+from drf_tsdk.settings import get_setting
+
+
+def _forget_mappers(module_name: str):
+    """Drops the mappers of the views and serializers defined in `module_name`, which are mapped
+    again when it is reloaded, and the endpoints mapped from them"""
+    DRFViewMapper.mappers[:] = [
+        view_mapper
+        for view_mapper in DRFViewMapper.mappers
+        if getattr(view_mapper.view, "__module__", None) != module_name
+    ]
+    DRFSerializerMapper.mappers[:] = [
+        serializer_mapper
+        for serializer_mapper in DRFSerializerMapper.mappers
+        if serializer_mapper.serializer.__module__ != module_name
+    ]
+    # rebuilt from the remaining mappers by the next generation
+    DRFViewMapper.mappings = dict()
 
 
 class Command(BaseCommand):
     help = "Generates TypeScript API bindings in the specified file"
 
+    # system checks import the URLconf, which must happen inside `defer_generation`
+    requires_system_checks = []
+
     def add_arguments(self, parser):
-        # TODO: implement this
-        pass
+        parser.add_argument(
+            "-o",
+            "--output",
+            dest="output_path",
+            help="The path of the TypeScript file. Defaults to every path passed to "
+            "`generate_typescript_bindings` by the URLconf.",
+        )
+        parser.add_argument(
+            "--layout",
+            choices=LAYOUTS,
+            help='"file" writes a single file, "directory" writes a module per namespace',
+        )
+        parser.add_argument(
+            "--api-name", dest="api_name", help="The name of the API object"
+        )
+        parser.add_argument(
+            "--header",
+            dest="headers",
+            action="append",
+            metavar="NAME=VALUE",
+            help="A header to add to every request. May be repeated.",
+        )
+        parser.add_argument(
+            "--csrf-token-variable-name",
+            dest="csrf_token_variable_name",
+            help="A JavaScript-evaluable string which returns the CSRF token",
+        )
+        parser.add_argument(
+            "--urlconf",
+            help="The module containing the `urlpatterns` to generate the client for. "
+            "Defaults to ROOT_URLCONF.",
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Exit with a non-zero status if a file is out of date, without writing it",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Generate the files even if the fingerprint of their inputs did not change",
+        )
+        parser.add_argument(
+            "--profile-dir",
+            dest="profile_dir",
+            help="Save a cProfile profile of each generation in this directory. "
+            "Defaults to the PROFILE_DIR setting.",
+        )
+
+    def _get_headers(self, headers):
+        ret = {}
+        for header in headers:
+            if "=" not in header:
+                raise CommandError(f"`--header` must be NAME=VALUE, got `{header}`")
+            key, value = header.split("=", 1)
+            ret[key.strip()] = value.strip()
+        return ret
+
+    def _get_targets(self, options):
+        urlconf = options["urlconf"] or settings.ROOT_URLCONF
+        with defer_generation():
+            if urlconf in sys.modules:
+                # its calls to `generate_typescript_bindings` already ran when it was imported
+                _forget_mappers(urlconf)
+                urlconf_module = reload(sys.modules[urlconf])
+                # the resolvers of the URLconf hold the views it defined before
+                clear_url_caches()
+            else:
+                urlconf_module = import_module(urlconf)
+
+        overrides = {}
+        if options["api_name"] is not None:
+            overrides["api_name"] = options["api_name"]
+        if options["headers"] is not None:
+            overrides["headers"] = self._get_headers(options["headers"])
+        if options["csrf_token_variable_name"] is not None:
+            overrides["csrf_token_variable_name"] = options["csrf_token_variable_name"]
+        if options["layout"] is not None:
+            overrides["layout"] = options["layout"]
+
+        if options["output_path"]:
+            target = deferred_targets.get(
+                options["output_path"],
+                dict(
+                    output_path=options["output_path"],
+                    api_name="API",
+                    headers={},
+                    csrf_token_variable_name=None,
+                    post_processor=_default_processor,
+                    client_options=ClientOptions(),
+                    layout="file",
+                ),
+            )
+            if not hasattr(urlconf_module, "urlpatterns"):
+                raise CommandError(f"`{urlconf}` does not define `urlpatterns`.")
+            return [{**target, "urlpatterns": urlconf_module.urlpatterns, **overrides}]
+
+        if not deferred_targets:
+            raise CommandError(
+                f"`{urlconf}` does not call `generate_typescript_bindings` when imported; "
+                "pass `--output`."
+            )
+        return [{**target, **overrides} for target in deferred_targets.values()]
+
+    def _generate(self, target, options, stats) -> bool:
+        """Generates the client of `target`, or only checks it with `--check`. Returns `False` if
+        it is out of date."""
+        output_path = target.pop("output_path")
+        layout = target.pop("layout", "file")
+
+        fingerprint = None
+        if get_setting("USE_FINGERPRINT"):
+            with _timed(stats.timings, "fingerprint"):
+                fingerprint = get_fingerprint(**target)
+            if (
+                not options["check"]
+                and not options["force"]
+                and read_fingerprint(get_index_path(output_path, layout)) == fingerprint
+            ):
+                stats.is_skipped = True
+                self.stdout.write(
+                    "%s is up to date (fingerprint computed in %.1fms)"
+                    % (output_path, stats.timings["fingerprint"] * 1000)
+                )
+                return True
+
+        render_cache = None
+        if not options["check"]:
+            render_cache = get_render_cache(
+                output_path,
+                target["headers"],
+                target["csrf_token_variable_name"],
+                target["client_options"],
+            )
+        generation_kwargs = dict(
+            **target,
+            timings=stats.timings,
+            counters=stats.counters,
+            fingerprint=fingerprint,
+            render_cache=render_cache,
+        )
+        if options["check"] and layout == "directory":
+            is_stale = bool(get_stale_modules(output_path, **generation_kwargs))
+        elif options["check"]:
+            # only the hash of the output is needed
+            emitter = emit_typescript_bindings(None, **generation_kwargs)
+            is_stale = get_file_digest(output_path) != emitter.hexdigest()
+        elif layout == "directory":
+            stats.is_written = stream_typescript_modules(
+                output_path, **generation_kwargs
+            )
+        else:
+            stats.is_written = stream_typescript_bindings(
+                output_path, **generation_kwargs
+            )
+        self.stdout.write(
+            "%s: resolved URLs in %.1fms, mapped views in %.1fms, built interfaces and "
+            "rendered in %.1fms, of which %.1fms introspecting serializers"
+            % (
+                output_path,
+                stats.timings["url_resolution"] * 1000,
+                stats.timings["view_mapping"] * 1000,
+                # serializers are introspected lazily, as interfaces and endpoints are rendered
+                (stats.timings["interface_building"] + stats.timings["rendering"])
+                * 1000,
+                stats.timings.get("serializer_introspection", 0) * 1000,
+            )
+        )
+
+        if options["check"]:
+            if is_stale:
+                self.stderr.write(f"{output_path} is out of date")
+                return False
+            self.stdout.write(f"{output_path} is up to date")
+            return True
+
+        if stats.is_written:
+            self.stdout.write(self.style.SUCCESS(f"Wrote {output_path}"))
+        else:
+            self.stdout.write(f"{output_path} is up to date")
+        if render_cache is not None:
+            render_cache.save()
+            self.stdout.write(
+                "Rendered %d fragment(s), reused %d"
+                % (render_cache.misses, render_cache.hits)
+            )
+        return True
 
     def handle(self, *args, **options):
-        # TODO: implement this
-        pass
+        stale_paths = []
+        for target in self._get_targets(options):
+            with measure_generation(
+                target["output_path"], profile_dir=options["profile_dir"]
+            ) as stats:
+                if not self._generate(target, options, stats):
+                    stale_paths.append(stats.output_path)
+
+        if stale_paths:
+            raise CommandError(
+                "%d TypeScript API client(s) out of date" % len(stale_paths)
+            )
@@ -0,0 +1,66 @@
+import logging
+import re
+from typing import Dict, NamedTuple, Optional
+
+from rest_framework.pagination import (
+    CursorPagination,
+    LimitOffsetPagination,
+    PageNumberPagination,
+)
+
+_logger = logging.getLogger(f"drf-tsdk.{__name__}")
+
+_IDENTIFIER_RE = re.compile(r"^[A-Za-z_$][0-9A-Za-z_$]*$")
+
+
+class Pagination(NamedTuple):
+    envelope: str  # the name of the generic TypeScript interface of a page
+    query: Dict[
+        str, str
+    ]  # the TypeScript type of each query parameter of the paginator
+
+    def ts_query_string(self) -> str:
+        """Returns the TypeScript type of the query parameters of the paginator"""
+        return (
+            "{ "
+            + ", ".join(
+                (param if _IDENTIFIER_RE.match(param) else '"%s"' % param)
+                + "?: "
+                + ts_type
+                for param, ts_type in self.query.items()
+            )
+            + " }"
+        )
+
+
+def get_pagination(view_class) -> Optional[Pagination]:
+    """Returns how the list responses of `view_class` are paginated, or None if they are not,
+    or if its paginator returns a custom envelope"""
+    pagination_class = getattr(view_class, "pagination_class", None)
+    if not isinstance(pagination_class, type):
+        return None
+    for base in (CursorPagination, LimitOffsetPagination, PageNumberPagination):
+        if issubclass(pagination_class, base):
+            break
+    else:
+        _logger.debug("Unknown pagination class %s", pagination_class)
+        return None
+    if pagination_class.get_paginated_response is not base.get_paginated_response:
+        _logger.debug("%s returns a custom envelope", pagination_class)
+        return None
+
+    if base is PageNumberPagination:
+        envelope = "Page"
+        query = {pagination_class.page_query_param: "number"}
+    elif base is LimitOffsetPagination:
+        envelope = "Page"
+        query = {
+            pagination_class.limit_query_param: "number",
+            pagination_class.offset_query_param: "number",
+        }
+    else:
+        envelope = "CursorPage"
+        query = {pagination_class.cursor_query_param: "string"}
+    if getattr(pagination_class, "page_size_query_param", None):
+        query[pagination_class.page_size_query_param] = "number"
+    return Pagination(envelope, query)
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, Optional, Tuple
+
+from .drf_to_ts import DRFSerializerMapper, DRFViewMapper
+from .fingerprint import FINGERPRINT_VERSION, InputFingerprinter, _qualified_name
+from .helpers import SERIALIZER_FIELD_MAPPINGS
+from .pagination import get_pagination
+from .runtime import ClientOptions
+from .settings import get_setting
+
+_logger = logging.getLogger(f"drf-tsdk.{__name__}")
+
+
+class RenderCache:
+    """A persistent cache of the rendered TypeScript of each interface and endpoint.
+
+    Each fragment is keyed by a fingerprint of the serializer or view it was rendered from.
+    Since a serializer's fingerprint includes the fingerprints of the serializers nested in it,
+    changing `InnerBarSerializer` also invalidates the fragments of `BarSerializer` and of
+    every endpoint using either of them. The names of the registered interfaces, which any
+    fragment may refer to, are part of every key.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        headers: dict,
+        csrf_token_variable_name=None,
+        client_options: ClientOptions = ClientOptions(),
+    ):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._fingerprinter = InputFingerprinter()
+        self._fragments = self._load()
+        self._used_fragments: Dict[str, str] = {}
+        self._view_mappers = {}
+        for view_mapper in DRFViewMapper.mappers:
+            self._view_mappers.setdefault(tuple(view_mapper.path), view_mapper)
+        self._context = self._get_digest(
+            [
+                FINGERPRINT_VERSION,
+                {
+                    _qualified_name(field_class): ts_type
+                    for field_class, ts_type in SERIALIZER_FIELD_MAPPINGS.items()
+                },
+                [
+                    (_qualified_name(mapper.serializer), mapper.name)
+                    for mapper in DRFSerializerMapper.mappers
+                ],
+            ]
+        )
+        self._endpoint_context = self._get_digest(
+            [
+                self._context,
+                headers,
+                csrf_token_variable_name,
+                client_options._asdict(),
+            ]
+        )
+
+    def _load(self) -> Dict[str, str]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as cache_file:
+                data = json.load(cache_file)
+        except (OSError, ValueError):
+            _logger.warning("Ignoring unreadable render cache %s", self.path)
+            return {}
+        if data.get("version") != FINGERPRINT_VERSION:
+            return {}
+        return data.get("fragments", {})
+
+    def _get_digest(self, value) -> str:
+        return hashlib.sha256(
+            self._fingerprinter.describe(value).encode("utf-8")
+        ).hexdigest()
+
+    def interface_key(self, serializer_class, definition) -> str:
+        return self._get_digest(
+            [
+                self._context,
+                self._fingerprinter.describe_serializer_class(serializer_class),
+                definition.name,
+                definition.should_export,
+                definition.method,
+            ]
+        )
+
+    def endpoint_key(self, path: Tuple[str, ...], url_pattern) -> Optional[str]:
+        view_mapper = self._view_mappers.get(path)
+        if view_mapper is None:
+            return None
+        url, method, args, callback = url_pattern
+        return self._get_digest(
+            [
+                self._endpoint_context,
+                self._fingerprinter.describe_view_mapper(view_mapper),
+                [url, method, args],
+                get_pagination(
+                    getattr(callback, "cls", None)
+                    or getattr(callback, "view_class", None)
+                ),
+            ]
+        )
+
+    def get(self, key: Optional[str]) -> Optional[str]:
+        if key is None:
+            return None
+        # fragments are rendered twice per generation; see `_Fragments`
+        text = self._used_fragments.get(key)
+        if text is not None:
+            return text
+        text = self._fragments.get(key)
+        if text is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._used_fragments[key] = text
+        return text
+
+    def set(self, key: Optional[str], text: str) -> None:
+        if key is not None:
+            self._used_fragments[key] = text
+
+    def save(self) -> None:
+        """Writes the fragments used by the last render, dropping every other fragment"""
+        if self.misses == 0 and len(self._used_fragments) == len(self._fragments):
+            return
+        _logger.debug(
+            "Saving render cache %s (%d hits, %d misses)",
+            self.path,
+            self.hits,
+            self.misses,
+        )
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as cache_file:
+            json.dump(
+                {"version": FINGERPRINT_VERSION, "fragments": self._used_fragments},
+                cache_file,
+            )
+        os.replace(tmp_path, self.path)
+
+
+def get_render_cache(
+    output_path: str,
+    headers: dict,
+    csrf_token_variable_name=None,
+    client_options: ClientOptions = ClientOptions(),
+) -> Optional[RenderCache]:
+    """Returns the render cache of `output_path`, or None if `RENDER_CACHE_DIR` is not set"""
+    cache_dir = get_setting("RENDER_CACHE_DIR")
+    if not cache_dir:
+        return None
+    name = hashlib.sha1(os.path.abspath(output_path).encode("utf-8")).hexdigest()
+    return RenderCache(
+        os.path.join(cache_dir, f"{name[:16]}.json"),
+        headers=headers,
+        csrf_token_variable_name=csrf_token_variable_name,
+        client_options=client_options,
+    )
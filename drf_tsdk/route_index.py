@@ -0,0 +1,146 @@
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from django.urls import URLResolver
+
+from .exceptions import DRFTypeScriptAPIClientException
+
+_logger = logging.getLogger(f"drf-tsdk.{__name__}")
+
+
+class Route(NamedTuple):
+    url: str  # a TypeScript string or template literal
+    method: str
+    args: List[str]
+    callback: Any
+
+
+class DecoratedViews:
+    """The views decorated with `@ts_api_endpoint`, used to skip URL patterns routing to other views"""
+
+    def __init__(self, views):
+        self._views = set()
+        self._names = (
+            set()
+        )  # (module, name) of decorated classes and of the classes of decorated methods
+        self._view_classes = dict()
+        # whether each `include()`d resolver routes to a decorated view
+        self._resolvers = dict()
+        for view in views:
+            self._views.add(view)
+            module = getattr(view, "__module__", None)
+            qualname = getattr(view, "__qualname__", "")
+            self._names.add((module, qualname))
+            self._names.add((module, qualname.rpartition(".")[0]))
+            # `@api_view` names its view class after the function it wraps
+            self._names.add((module, getattr(view, "__name__", None)))
+
+    def _is_decorated_view_class(self, view_class) -> bool:
+        ret = self._view_classes.get(view_class)
+        if ret is None:
+            ret = any(
+                (base.__module__, base.__qualname__) in self._names
+                or (base.__module__, base.__name__) in self._names
+                for base in view_class.__mro__
+            )
+            self._view_classes[view_class] = ret
+        return ret
+
+    def __contains__(self, callback) -> bool:
+        if callback in self._views:
+            return True
+        view_class = getattr(callback, "cls", None) or getattr(
+            callback, "view_class", None
+        )
+        return isinstance(view_class, type) and self._is_decorated_view_class(
+            view_class
+        )
+
+    def should_include(self, url_pattern) -> bool:
+        return url_pattern.callback in self
+
+    def should_descend(self, resolver) -> bool:
+        ret = self._resolvers.get(resolver)
+        if ret is None:
+            # stops at the first decorated view, and each nested resolver is only searched once
+            ret = any(
+                self.should_descend(url_pattern)
+                if isinstance(url_pattern, URLResolver)
+                else getattr(url_pattern, "callback", None) in self
+                for url_pattern in resolver.url_patterns
+            )
+            self._resolvers[resolver] = ret
+        return ret
+
+
+class RouteIndex:
+    """Maps views to the routes they are served at, so that each endpoint finds its route in O(1).
+
+    Routes are indexed by the callback Django calls, by the module and qualified name of the
+    function handling them (a view function, or a ViewSet/APIView method), and by view class.
+    """
+
+    def __init__(self):
+        self._by_callback: Dict[Any, Route] = {}
+        self._by_name: Dict[Tuple[str, str], Route] = {}
+        self._by_view_class: Dict[type, Route] = {}
+        self.routes_scanned = 0
+
+    def add(
+        self,
+        route: Route,
+        module: str,
+        name: str,
+        view_class: Optional[type] = None,
+    ) -> None:
+        self.routes_scanned += 1
+        self._by_name[(module, name)] = route
+        # a callback handling several methods, or a view class routed at several URLs,
+        # is found at its first route
+        self._by_callback.setdefault(route.callback, route)
+        if view_class is not None:
+            self._by_view_class.setdefault(view_class, route)
+
+    def find(self, view) -> Optional[Route]:
+        route = self._by_callback.get(view)
+        if route is not None:
+            return route
+
+        module = getattr(view, "__module__", None)
+        for name in (
+            getattr(view, "__qualname__", None),
+            getattr(view, "__name__", None),
+        ):
+            route = self._by_name.get((module, name))
+            if route is not None:
+                return route
+
+        for view_class in (
+            view,
+            getattr(view, "cls", None),
+            getattr(view, "view_class", None),
+        ):
+            if isinstance(view_class, type):
+                route = self._by_view_class.get(view_class)
+                if route is not None:
+                    return route
+        return None
+
+    def get(self, view, path: Sequence[str] = ()) -> Route:
+        """Returns the route of `view`, which is registered at `path` in the API"""
+        route = self.find(view)
+        if route is not None:
+            return route
+
+        code = getattr(view, "__code__", None)
+        raise DRFTypeScriptAPIClientException(
+            "No URL pattern found for view `%s.%s`%s%s. Make sure that it is routed by the "
+            "`urlpatterns` passed to `generate_typescript_bindings`, and that `@ts_api_endpoint` "
+            "decorates a view function, an `@api_view`, or a method of a routed ViewSet or APIView."
+            % (
+                getattr(view, "__module__", "?"),
+                getattr(view, "__qualname__", str(view)),
+                "" if not path else f" (endpoint `{'.'.join(path)}`)",
+                "" if code is None else f" at {code.co_filename}:{code.co_firstlineno}",
+            )
+        )
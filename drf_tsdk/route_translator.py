@@ -0,0 +1,125 @@
+import re
+from typing import Dict, Iterable, List, Tuple
+
+from django.urls.resolvers import RegexPattern
+
+# the same as Django's, see `django.urls.resolvers._route_to_regex`
+_ROUTE_PARAMETER_RE = re.compile(r"<(?:(?P<converter>[^>:]+):)?(?P<parameter>[^>]+)>")
+_QUANTIFIER_RE = re.compile(r"[?*+]\??|\{\d*,?\d*\}\??")
+_NAMED_GROUP_RE = re.compile(r"\?P<(?P<name>[^>]+)>")
+
+_translations: Dict[int, tuple] = dict()  # id(pattern) -> (pattern, translation)
+
+
+def _find_group_end(regex: str, start: int) -> int:
+    """Returns the index of the parenthesis closing the group opened at `start`"""
+    depth = 0
+    in_class = False
+    i = start
+    while i < len(regex):
+        char = regex[i]
+        if char == "\\":
+            i += 1
+        elif in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    raise ValueError(f"Unbalanced parenthesis in {regex}")
+
+
+def _is_optional(regex: str, i: int) -> bool:
+    """Returns whether the quantifier at `i`, if any, allows zero repetitions"""
+    match = _QUANTIFIER_RE.match(regex, i)
+    return match is not None and (
+        match.group()[0] in "?*" or match.group().startswith(("{0,", "{,"))
+    )
+
+
+def _skip_quantifier(regex: str, i: int) -> int:
+    match = _QUANTIFIER_RE.match(regex, i)
+    return match.end() if match else i
+
+
+def _translate_regex(regex: str, args: List[str]) -> str:
+    """Translates a URL regex into a TypeScript template, appending its arguments to `args`.
+
+    Named groups become `${name}` and unnamed groups `${argN}`, regardless of what they
+    contain, and non-capturing groups are kept along with their arguments. Optional groups, e.g.
+    `(?:page/(?P<page>\\d+)/)?`, are dropped along with their arguments, since the URL matches
+    without them. Anchors, quantifiers and lookarounds are dropped.
+    """
+    ret = ""
+    i = 0
+    while i < len(regex):
+        char = regex[i]
+        if char == "\\" and i + 1 < len(regex):
+            ret += regex[i + 1]
+            i = _skip_quantifier(regex, i + 2)
+        elif char == "(":
+            end = _find_group_end(regex, i)
+            body = regex[i + 1 : end]
+            named_group = _NAMED_GROUP_RE.match(body)
+            if _is_optional(regex, end + 1):
+                pass
+            elif named_group:
+                args.append(named_group.group("name"))
+                ret += "${%s}" % named_group.group("name")
+            elif body.startswith("?:"):
+                ret += _translate_regex(body[2:], args)
+            elif not body.startswith("?"):
+                args.append(f"arg{len(args)}")
+                ret += "${%s}" % args[-1]
+            i = _skip_quantifier(regex, end + 1)
+        elif char in "^$":
+            i += 1
+        else:
+            ret += char
+            i = _skip_quantifier(regex, i + 1)
+    return ret
+
+
+def _translate_route(route: str, args: List[str]) -> str:
+    def replace(match):
+        args.append(match.group("parameter"))
+        return "${%s}" % match.group("parameter")
+
+    return _ROUTE_PARAMETER_RE.sub(replace, route)
+
+
+def translate_pattern(pattern) -> Tuple[str, Tuple[str, ...]]:
+    """Returns the TypeScript template and the arguments of a `RoutePattern` or `RegexPattern`.
+    The translation of each pattern object is memoized."""
+    cached = _translations.get(id(pattern))
+    if cached is not None and cached[0] is pattern:
+        return cached[1]
+
+    args = []
+    if isinstance(pattern, RegexPattern):
+        path = _translate_regex(str(pattern._regex), args)
+    else:
+        path = _translate_route(str(pattern), args)
+    translation = (path, tuple(args))
+    # the pattern is kept alive so that its id is not reused
+    _translations[id(pattern)] = (pattern, translation)
+    return translation
+
+
+def translate_url(prefixes: Iterable, pattern) -> Tuple[str, List[str]]:
+    """Returns the TypeScript string or template literal of the URL of `pattern`, under the
+    patterns of its enclosing `include()`s (see `resolve_urls`), and its arguments. Each pattern
+    is translated with its own syntax."""
+    path = ""
+    args = []
+    for prefix in tuple(prefixes) + (pattern,):
+        prefix_path, prefix_args = translate_pattern(prefix)
+        path += prefix_path
+        args.extend(prefix_args)
+    quote = "`" if args else '"'
+    return f"{quote}/{path}{quote}", args
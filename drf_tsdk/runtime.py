@@ -0,0 +1,815 @@
+import json
+from typing import Dict, List, NamedTuple, Optional
+
+
+class ClientOptions(NamedTuple):
+    """Options of the runtime of the generated client, set through `generate_typescript_bindings`"""
+
+    # the least recently used responses are evicted beyond this
+    cache_max_entries: int = 500
+    # in seconds; by default, cached responses never expire
+    cache_ttl: Optional[float] = None
+    # whether concurrent identical GET requests share a single request, unless their endpoint says otherwise
+    deduplicate_requests: bool = False
+    # if set, requests are sent in batches to this URL, which should route to `drf_tsdk.batch.BatchView`
+    batch_url: Optional[str] = None
+    # in seconds; requests made within this window of the first one are batched with it. If 0, the
+    # requests made within the same task are.
+    batch_window: float = 0
+    # larger batches are split; should match the `max_requests` of the `BatchView`
+    batch_max_requests: int = 50
+    # in seconds; the default of the `timeoutMs` parameter of every endpoint. By default, requests never time out.
+    timeout: Optional[float] = None
+    # the maximum number of attempts of a request to an idempotent endpoint; 1 never retries
+    retry_attempts: int = 1
+    # in seconds; the delay before the first retry, doubled before each of the following ones
+    retry_backoff: float = 0.5
+    # in seconds; the longest delay before a retry, including one set by `Retry-After`
+    retry_max_backoff: float = 30
+    # whether each delay is drawn at random between 0 and its backoff
+    retry_jitter: bool = True
+    # whether the `Retry-After` header of a response overrides its backoff
+    retry_after: bool = True
+
+
+def get_ts_milliseconds(seconds: Optional[float], default: str = "undefined") -> str:
+    """Returns a duration in seconds as a TypeScript number of milliseconds"""
+    if seconds is None:
+        return default
+    return str(int(round(seconds * 1000)))
+
+
+_RESPONSE_CACHE = """interface ResponseCacheEntry {
+    value: any;
+    expiresAt: number;
+    /** The path of the endpoint which returned the response, e.g. "foo.list" */
+    endpoint?: string;
+    /** The ETag or hash of the response, to tell whether revalidating it changed it */
+    version?: string;
+    etag?: string | null;
+    lastModified?: string | null;
+}
+
+class ResponseCache {
+    private entries = new Map<string, ResponseCacheEntry>();
+
+    constructor(
+        private maxEntries: number,
+        private defaultTtl: number,
+        private tagProviders: { [tag: string]: string[] } = {},
+    ) {}
+
+    /** Returns the cached response of `key`, or `undefined` if it is missing or expired */
+    get(key: string): any {
+        const entry = this.entries.get(key);
+        if (entry === undefined) {
+            return undefined;
+        }
+        if (entry.expiresAt <= Date.now()) {
+            // expired responses with a validator are kept until evicted, to be revalidated by a conditional request
+            if (!entry.etag && !entry.lastModified) {
+                this.entries.delete(key);
+            }
+            return undefined;
+        }
+        // maps iterate in insertion order, so the first entry is always the least recently used
+        this.entries.delete(key);
+        this.entries.set(key, entry);
+        return entry.value;
+    }
+
+    /** Returns the ETag or hash of the cached response of `key`, if it has one */
+    getVersion(key: string): string | undefined {
+        const entry = this.entries.get(key);
+        return entry === undefined ? undefined : entry.version;
+    }
+
+    /** Returns the headers making a request for `key` conditional on its cached response, even an expired one, having changed */
+    getConditionalHeaders(key: string): { [header: string]: string } {
+        const entry = this.entries.get(key);
+        const headers: { [header: string]: string } = {};
+        if (entry !== undefined && entry.etag) {
+            headers["If-None-Match"] = entry.etag;
+        }
+        if (entry !== undefined && entry.lastModified) {
+            headers["If-Modified-Since"] = entry.lastModified;
+        }
+        return headers;
+    }
+
+    /** Keeps the cached response of `key` for another `ttl` milliseconds after a `304 Not Modified`, and returns it */
+    revalidate(key: string, ttl?: number): any {
+        const entry = this.entries.get(key);
+        if (entry === undefined) {
+            return undefined;
+        }
+        entry.expiresAt = Date.now() + (ttl ?? this.defaultTtl);
+        this.entries.delete(key);
+        this.entries.set(key, entry);
+        return entry.value;
+    }
+
+    /** Caches `value` for `ttl` milliseconds, evicting the least recently used entries beyond `maxEntries` */
+    set(
+        key: string,
+        value: any,
+        { ttl, ...entry }: Omit<ResponseCacheEntry, "value" | "expiresAt"> & { ttl?: number } = {},
+    ): void {
+        this.entries.delete(key);
+        this.entries.set(key, { ...entry, value, expiresAt: Date.now() + (ttl ?? this.defaultTtl) });
+        while (this.entries.size > this.maxEntries) {
+            this.entries.delete(this.entries.keys().next().value);
+        }
+    }
+
+    /** Removes the cached response of a request path, including its query string */
+    invalidate(key: string): void {
+        this.entries.delete(key);
+    }
+
+    /** Removes every cached response whose request path starts with `prefix` or matches it */
+    invalidateMatching(prefix: string | RegExp): void {
+        for (const key of Array.from(this.entries.keys())) {
+            if (typeof prefix === "string" ? key.startsWith(prefix) : prefix.test(key)) {
+                this.entries.delete(key);
+            }
+        }
+    }
+
+    /** Removes every cached response of the endpoints at `endpoints`, e.g. `["foo.list"]` */
+    invalidateEndpoints(endpoints: string[]): void {
+        for (const [key, entry] of Array.from(this.entries.entries())) {
+            if (entry.endpoint !== undefined && endpoints.indexOf(entry.endpoint) !== -1) {
+                this.entries.delete(key);
+            }
+        }
+    }
+
+    /** Removes every cached response of the endpoints providing any of `tags` (see `cacheTags`) */
+    invalidateTags(tags: string[]): void {
+        this.invalidateEndpoints(
+            tags.reduce((endpoints: string[], tag) => endpoints.concat(this.tagProviders[tag] || []), []),
+        );
+    }
+
+    clear(): void {
+        this.entries.clear();
+    }
+}
+"""
+
+
+_FETCH_DEDUPLICATED = """const inFlightRequests = new Map<string, Promise<Response>>();
+
+/** Like `fetch`, but concurrent calls with the same `requestPath` share a single request, and each receives its own copy of the response */
+function fetchDeduplicated(requestPath: string, init: RequestInit): Promise<Response> {
+    // aborting one call must not abort the request shared with the others
+    const { signal, ...sharedInit } = init;
+    let request = inFlightRequests.get(requestPath);
+    if (request === undefined) {
+        request = sendRequest(requestPath, sharedInit).finally(() => inFlightRequests.delete(requestPath));
+        inFlightRequests.set(requestPath, request);
+    }
+    // the shared response is never read, so that it can be cloned for every caller
+    return abortable(request.then((response) => response.clone()), signal);
+}
+"""
+
+
+_FETCH_BATCHED = """interface BatchedRequest {
+    request: {
+        path: string;
+        method: string;
+        query: { [key: string]: string | string[] };
+        body?: any;
+        headers: { [header: string]: string };
+    };
+    resolve(response: Response): void;
+    reject(error: any): void;
+}
+
+let batchQueue: BatchedRequest[] = [];
+
+/** Sends the queued requests as a single request to the batch view, and settles each with its own response */
+function flushBatch(): void {
+    const batch = batchQueue;
+    batchQueue = [];
+    if (batch.length === 0) {
+        return;
+    }
+    fetch(BATCH_URL, {
+        method: "POST",
+        headers: BATCH_HEADERS,
+        body: JSON.stringify(batch.map((queued) => queued.request)),
+    })
+        .then((response) => {
+            if (!response.ok) {
+                batch.forEach((queued) => queued.resolve(response.clone()));
+                return;
+            }
+            return response.json().then((results: { status: number; headers: { [header: string]: string }; body: any }[]) =>
+                results.forEach((result, i) =>
+                    batch[i].resolve(
+                        new Response(
+                            result.body === null || result.status === 204 || result.status === 304 ? null : JSON.stringify(result.body),
+                            { status: result.status, headers: result.headers },
+                        ),
+                    ),
+                ),
+            );
+        })
+        .catch((error) => batch.forEach((queued) => queued.reject(error)));
+}
+
+/** Like `fetch`, but queues the request to be sent to the batch view along with the other requests made in the meantime */
+function fetchBatched(requestPath: string, init: RequestInit): Promise<Response> {
+    const url = new URL(requestPath, "http://localhost");
+    const query: { [key: string]: string | string[] } = {};
+    url.searchParams.forEach((_, key) => {
+        const values = url.searchParams.getAll(key);
+        query[key] = values.length === 1 ? values[0] : values;
+    });
+    // only the headers which differ from the batch request's are sent along with each request
+    const batchHeaders = new Headers(BATCH_HEADERS);
+    const headers: { [header: string]: string } = {};
+    new Headers(init.headers).forEach((value, header) => {
+        if (header !== "content-type" && batchHeaders.get(header) !== value) {
+            headers[header] = value;
+        }
+    });
+    return new Promise((resolve, reject) => {
+        const signal = init.signal;
+        // a call aborted before its batch is sent is left out of it
+        const onAbort = () => {
+            batchQueue = batchQueue.filter((other) => other !== queued);
+            reject(signal!.reason);
+        };
+        // the caller's signal may outlive the call, e.g. that of a component
+        const removeAbortListener = () => signal && signal.removeEventListener("abort", onAbort);
+        const queued: BatchedRequest = {
+            request: {
+                path: url.pathname,
+                method: init.method || "GET",
+                query,
+                body: typeof init.body === "string" ? JSON.parse(init.body) : undefined,
+                headers,
+            },
+            resolve: (response) => {
+                removeAbortListener();
+                resolve(response);
+            },
+            reject: (error) => {
+                removeAbortListener();
+                reject(error);
+            },
+        };
+        if (signal) {
+            signal.addEventListener("abort", onAbort, { once: true });
+        }
+        batchQueue.push(queued);
+        if (batchQueue.length >= BATCH_MAX_REQUESTS) {
+            flushBatch();
+        } else if (batchQueue.length === 1) {
+            BATCH_SCHEDULE;
+        }
+    });
+}
+"""
+
+
+_REQUEST_CONTROLLER = """/** A call to an endpoint, which resolves to `undefined` once cancelled */
+export interface CancelablePromise<T> extends Promise<T | undefined> {
+    cancel(): void;
+}
+
+/** Returns `promise`, or a promise rejected as soon as `signal` aborts */
+function abortable<T>(promise: Promise<T>, signal?: AbortSignal | null): Promise<T> {
+    if (!signal) {
+        return promise;
+    }
+    return new Promise((resolve, reject) => {
+        const onAbort = () => reject(signal.reason);
+        if (signal.aborted) {
+            return onAbort();
+        }
+        signal.addEventListener("abort", onAbort, { once: true });
+        promise.then(resolve, reject).finally(() => signal.removeEventListener("abort", onAbort));
+    });
+}
+
+const latestRequests = new Map<string, RequestController>();
+
+/** Aborts a call to an endpoint on `cancel()`, when the caller's `signal` aborts, after `timeoutMs`,
+ * or, given a `latestWinsKey`, when the next call with the same key starts */
+class RequestController {
+    private controller = new AbortController();
+    private isCancelled = false;
+    private timeout?: ReturnType<typeof setTimeout>;
+
+    constructor(signal?: AbortSignal | null, timeoutMs?: number, private latestWinsKey?: string) {
+        if (signal) {
+            if (signal.aborted) {
+                this.cancel();
+            } else {
+                signal.addEventListener("abort", () => this.cancel(), { once: true });
+            }
+        }
+        if (timeoutMs !== undefined) {
+            this.timeout = setTimeout(
+                () => this.controller.abort(new DOMException("The request timed out", "TimeoutError")),
+                timeoutMs,
+            );
+        }
+        if (latestWinsKey !== undefined) {
+            latestRequests.get(latestWinsKey)?.cancel();
+            latestRequests.set(latestWinsKey, this);
+        }
+    }
+
+    get signal(): AbortSignal {
+        return this.controller.signal;
+    }
+
+    cancel(): void {
+        this.isCancelled = true;
+        this.controller.abort();
+    }
+
+    /** Returns `promise` with a `cancel()` method. Once cancelled, it resolves to `undefined` instead of
+     * rejecting. Given `onError`, it passes it any other error, e.g. a timeout, and resolves to `undefined`. */
+    wrap<T>(promise: Promise<T>, onError?: (error: any) => void): CancelablePromise<T> {
+        const ret = promise
+            .catch((error) => {
+                if (this.isCancelled) {
+                    return undefined;
+                }
+                if (onError) {
+                    onError(error);
+                    return undefined;
+                }
+                throw error;
+            })
+            .finally(() => {
+                clearTimeout(this.timeout);
+                if (this.latestWinsKey !== undefined && latestRequests.get(this.latestWinsKey) === this) {
+                    latestRequests.delete(this.latestWinsKey);
+                }
+            });
+        return Object.assign(ret, { cancel: () => this.cancel() });
+    }
+}
+"""
+
+
+_SEND_WITH_RETRY = """interface RetryPolicy {
+    attempts: number;
+    backoff: number;
+    maxBackoff: number;
+    jitter: boolean;
+    retryAfter: boolean;
+}
+
+const RETRIED_STATUSES = [408, 429, 502, 503, 504];
+
+/** Returns the number of milliseconds to wait after the failed attempt number `attempt` */
+function getRetryDelay(policy: RetryPolicy, attempt: number, response?: Response): number {
+    const retryAfter = response && response.headers.get("Retry-After");
+    if (policy.retryAfter && retryAfter) {
+        const seconds = Number(retryAfter);
+        const delay = isNaN(seconds) ? Date.parse(retryAfter) - Date.now() : seconds * 1000;
+        if (!isNaN(delay)) {
+            // a server may ask for a delay far longer than the call should wait
+            return Math.min(Math.max(0, delay), policy.maxBackoff);
+        }
+    }
+    const backoff = Math.min(policy.backoff * 2 ** (attempt - 1), policy.maxBackoff);
+    return policy.jitter ? Math.random() * backoff : backoff;
+}
+
+function sleep(milliseconds: number, signal?: AbortSignal | null): Promise<void> {
+    return abortable(new Promise((resolve) => setTimeout(resolve, milliseconds)), signal);
+}
+
+/** Calls `send` again after a 408, 429, 502, 503 or 504 response, or a network error, up to `policy.attempts` times in total */
+function sendWithRetry(send: () => Promise<Response>, policy: RetryPolicy, signal?: AbortSignal | null): Promise<Response> {
+    const attempt = (n: number): Promise<Response> =>
+        send().then(
+            (response) =>
+                n < policy.attempts && RETRIED_STATUSES.includes(response.status)
+                    ? sleep(getRetryDelay(policy, n, response), signal).then(() => attempt(n + 1))
+                    : response,
+            (error) => {
+                if (n >= policy.attempts || (signal && signal.aborted)) {
+                    throw error;
+                }
+                return sleep(getRetryDelay(policy, n), signal).then(() => attempt(n + 1));
+            },
+        );
+    return attempt(1);
+}
+"""
+
+
+_READ_STREAM = """/** Passes each item of a newline-delimited JSON or JSON text sequence body to `onChunk` as soon as
+ * it is received, and waits for the promise `onChunk` may return before reading on */
+async function readStream<T>(response: Response, onChunk: (item: T) => void | Promise<void>): Promise<void> {
+    if (!response.body) {
+        return;
+    }
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    const parse = async (line: string) => {
+        // JSON text sequences prefix each item with a record separator
+        line = line.replace(/^\\x1e/, "").trim();
+        if (line) {
+            await onChunk(JSON.parse(line));
+        }
+    };
+    try {
+        for (;;) {
+            const { done, value } = await reader.read();
+            buffer += decoder.decode(value, { stream: !done });
+            let newline;
+            while ((newline = buffer.indexOf("\\n")) !== -1) {
+                await parse(buffer.slice(0, newline));
+                buffer = buffer.slice(newline + 1);
+            }
+            if (done) {
+                return await parse(buffer);
+            }
+        }
+    } catch (error) {
+        reader.cancel().catch(() => {});
+        throw error;
+    }
+}
+
+/** The callbacks of a streaming endpoint */
+export interface StreamHandlers<T> {
+    onChunk(item: T): Promise<void>;
+    onError(error: any): void;
+}
+
+/** Returns an async iterator over the items of a streaming endpoint, which reads the next item
+ * only once the current one is consumed, and cancels the call if the loop exits early:
+ *
+ *     for await (const foo of iterateStream<Foo>((handlers) => API.foo.export({ ...handlers }))) { ... }
+ */
+export function iterateStream<T>(call: (handlers: StreamHandlers<T>) => CancelablePromise<void>): AsyncIterableIterator<T> {
+    let request: CancelablePromise<void> | undefined;
+    let item: { value: T } | undefined;
+    let resume: (() => void) | undefined;
+    let wake: (() => void) | undefined;
+    let isDone = false;
+    let failure: { error: any } | undefined;
+    const notify = () => {
+        const wake_ = wake;
+        wake = undefined;
+        wake_ && wake_();
+    };
+    const finish = (error?: { error: any }) => {
+        failure = failure || error;
+        isDone = true;
+        notify();
+    };
+    return {
+        [Symbol.asyncIterator]() {
+            return this;
+        },
+        async next(): Promise<IteratorResult<T>> {
+            if (request === undefined) {
+                request = call({
+                    onChunk: (value: T) => {
+                        item = { value };
+                        notify();
+                        return new Promise<void>((resolve) => (resume = resolve));
+                    },
+                    onError: (error: any) => finish({ error }),
+                });
+                request.then(() => finish(), (error) => finish({ error }));
+            } else if (resume) {
+                const resume_ = resume;
+                resume = undefined;
+                resume_();
+            }
+            while (item === undefined && !isDone) {
+                await new Promise<void>((resolve) => (wake = resolve));
+            }
+            if (item !== undefined) {
+                const { value } = item;
+                item = undefined;
+                return { value, done: false };
+            }
+            if (failure) {
+                throw failure.error;
+            }
+            return { value: undefined, done: true };
+        },
+        async return(): Promise<IteratorResult<T>> {
+            request && request.cancel();
+            finish();
+            // lets the aborted stream fail and release its connection
+            resume && resume();
+            return { value: undefined, done: true };
+        },
+    };
+}
+"""
+
+
+_ITERATE_PAGES = """/** A page of a list endpoint paginated by `PageNumberPagination` or `LimitOffsetPagination` */
+export interface Page<T> {
+    count: number;
+    next: string | null;
+    previous: string | null;
+    results: T[];
+}
+
+/** A page of a list endpoint paginated by `CursorPagination` */
+export interface CursorPage<T> {
+    next: string | null;
+    previous: string | null;
+    results: T[];
+}
+
+/** The parameters `iteratePages` calls a paginated endpoint with */
+export interface PageParams<Q, P> {
+    query?: Q;
+    onSuccess(page: P): void;
+    onError(error: any): void;
+}
+
+/** A paginated endpoint, whose query `Q` and page `P` are inferred by `iteratePages` */
+type PageEndpoint<Q, P> = (params: PageParams<Q, P>) => CancelablePromise<void> | undefined;
+
+/** Requests a page; the promise resolves to `undefined` if the call is cancelled */
+function requestPage<Q, P>(endpoint: PageEndpoint<Q, P>, query: Q | undefined) {
+    let request: CancelablePromise<void> | undefined;
+    const page = new Promise<P | undefined>((resolve, reject) => {
+        request = endpoint({ query, onSuccess: resolve, onError: reject });
+        // a call which settles without calling either handler was cancelled
+        request && request.then(() => resolve(undefined), reject);
+    });
+    // a prefetched page which fails is only reported once it is awaited
+    page.catch(() => {});
+    return { page, cancel: () => request && request.cancel() };
+}
+
+/** Returns an async iterator over the pages of a paginated list endpoint, starting with `query`,
+ * which requests each page while the previous one is consumed, and cancels it if the loop exits early:
+ *
+ *     for await (const page of iteratePages(API.foo.list, { search })) { ... }
+ */
+export async function* iteratePages<Q extends object, P extends CursorPage<any>>(
+    endpoint: PageEndpoint<Q, P>,
+    query?: Q,
+): AsyncGenerator<P, void, undefined> {
+    let next: ReturnType<typeof requestPage<Q, P>> | undefined = requestPage(endpoint, query);
+    try {
+        while (next !== undefined) {
+            const page: P | undefined = await next.page;
+            if (page === undefined) {
+                return;
+            }
+            next = undefined;
+            if (page.next) {
+                // the next page carries the query of this one, as strings, which the server parses
+                // like the numbers and booleans of `Q`
+                const nextQuery: { [param: string]: string } = {};
+                new URL(page.next, "http://localhost").searchParams.forEach((value, param) => (nextQuery[param] = value));
+                next = requestPage(endpoint, nextQuery as unknown as Q);
+            }
+            yield page;
+        }
+    } finally {
+        next && next.cancel();
+    }
+}
+"""
+
+
+_HASH_RESPONSE = """/** Returns a cheap hash of a response, to tell whether revalidating it changed it */
+function hashResponse(value: any): string {
+    const text = JSON.stringify(value);
+    let hash = 0x811c9dc5;
+    for (let i = 0; i < text.length; i++) {
+        hash ^= text.charCodeAt(i);
+        hash = Math.imul(hash, 0x01000193);
+    }
+    return (hash >>> 0).toString(16) + ":" + text.length;
+}
+"""
+
+
+_REQUEST = """/** The parameters of a call to an endpoint */
+export interface RequestParams<Query, Data, Result> {
+    query?: Query;
+    data?: Data;
+    options?: RequestInit;
+    /** Aborts the request after this many milliseconds. Defaults to `DEFAULT_TIMEOUT`. */
+    timeoutMs?: number;
+    /** Called when the request returns a successful response */
+    onSuccess?(result: Result): void;
+    /** Called when the request errors out */
+    onError?(error: any): void;
+    /** If `true`, caches the returned data if the request is successful. */
+    shouldUpdateCache?: boolean;
+}
+
+/** The parameters of a call to a GET endpoint */
+export interface GetParams<Query, Data, Result> extends RequestParams<Query, Data, Result> {
+    /** If `true`, uses data that was cached previously when this request returned a successful response. */
+    shouldUseCache?: boolean;
+    /** If `true`, calls `onSuccess` with the cached data at once, then refreshes it and calls `onSuccess` again if it changed. Defaults to the `stale_while_revalidate` of the endpoint. */
+    staleWhileRevalidate?: boolean;
+}
+
+/** The parameters of a call to an endpoint streaming its response */
+export interface StreamParams<Query, Data, Item> extends Omit<RequestParams<Query, Data, Item>, "onSuccess" | "shouldUpdateCache"> {
+    /** Called with each item of a successful response as soon as it is received. The next item is only read once the promise it returns resolves. */
+    onChunk?(item: Item): void | Promise<void>;
+    /** Called once the whole response was received */
+    onSuccess?(): void;
+}
+
+/** What `request` needs to know about an endpoint; omitted flags are `false` */
+export interface Endpoint {
+    method: string;
+    /** The path of the endpoint in the API, e.g. "foo.list" */
+    endpoint: string;
+    /** Whether its responses are cached, i.e. whether it is a GET endpoint which is not streamed */
+    cached?: boolean;
+    ttl?: number;
+    staleWhileRevalidate?: boolean;
+    deduplicate?: boolean;
+    latestWins?: boolean;
+    retry?: RetryPolicy;
+    stream?: boolean;
+    /** The cache tags invalidated by a successful response */
+    invalidates?: string[];
+}
+
+type AnyParams = Omit<GetParams<any, any, any>, "onSuccess"> & {
+    onChunk?(item: any): void | Promise<void>;
+    onSuccess?(result?: any): void;
+};
+
+/** Calls `endpoint` at `url`; every endpoint of the client goes through here. If the call is
+ * answered from the cache, the promise resolves at once. Errors, including timeouts, network errors
+ * and exhausted retries, are passed to `onError`, and the promise resolves; only without `onError`
+ * does it reject. A cancelled call calls neither `onSuccess` nor `onError`. */
+export function request(endpoint: Endpoint, url: string, params: AnyParams): CancelablePromise<void> {
+    const requestPath = url + (params.query ? "?" + new URLSearchParams(params.query).toString() : "");
+    const staleWhileRevalidate = endpoint.cached && (params.staleWhileRevalidate ?? !!endpoint.staleWhileRevalidate);
+    const cachedResult = endpoint.cached && (params.shouldUseCache || staleWhileRevalidate) ? cache.get(requestPath) : undefined;
+    if (cachedResult !== undefined) {
+        params.onSuccess && params.onSuccess(cachedResult);
+        if (!staleWhileRevalidate) {
+            return new RequestController().wrap(Promise.resolve());
+        }
+    }
+    const controller = new RequestController(params.options && params.options.signal, params.timeoutMs ?? DEFAULT_TIMEOUT, endpoint.latestWins ? endpoint.endpoint : undefined);
+    // streamed responses are never batched
+    const transport = endpoint.cached && endpoint.deduplicate ? fetchDeduplicated : endpoint.stream ? fetch : sendRequest;
+    const send = () =>
+        transport(requestPath, {
+            method: endpoint.method,
+            headers: endpoint.cached ? Object.assign(HEADERS, cache.getConditionalHeaders(requestPath)) : HEADERS,
+            body: params.data === undefined ? undefined : JSON.stringify(params.data),
+            ...params.options,
+            signal: controller.signal,
+        });
+    const onError = (error: any) => params.onError && params.onError(error);
+    return controller.wrap(
+        (endpoint.retry ? sendWithRetry(send, endpoint.retry, controller.signal) : send()).then((response): Promise<void> | void => {
+            if (endpoint.cached && response.status === 304) {
+                const result = cache.revalidate(requestPath, endpoint.ttl);
+                if (result !== undefined) {
+                    if (cachedResult === undefined) {
+                        params.onSuccess && params.onSuccess(result);
+                    }
+                    return;
+                }
+            }
+            if (!response.ok) {
+                return response
+                    .text()
+                    .then((message) => onError({ response, status: response.status, statusText: response.statusText, message }))
+                    .catch(onError);
+            }
+            if (endpoint.invalidates) {
+                cache.invalidateTags(endpoint.invalidates);
+            }
+            if (endpoint.stream) {
+                return readStream(response, (item) => params.onChunk && params.onChunk(item))
+                    .then(() => params.onSuccess && params.onSuccess())
+                    .catch(onError);
+            }
+            return response
+                .json()
+                .then((result) => {
+                    const version = staleWhileRevalidate ? response.headers.get("ETag") || hashResponse(result) : undefined;
+                    const isUnchanged = cachedResult !== undefined && version !== undefined && version === cache.getVersion(requestPath);
+                    if (params.shouldUpdateCache || staleWhileRevalidate) {
+                        const entry = { ttl: endpoint.ttl, endpoint: endpoint.endpoint };
+                        cache.set(
+                            requestPath,
+                            result,
+                            endpoint.cached ? { ...entry, version, etag: response.headers.get("ETag"), lastModified: response.headers.get("Last-Modified") } : entry,
+                        );
+                    }
+                    if (!isUnchanged) {
+                        params.onSuccess && params.onSuccess(result);
+                    }
+                })
+                .catch(onError);
+        }),
+        params.onError && onError,
+    );
+}
+"""
+
+
+def _get_send_request_text(client_options: ClientOptions, headers: str) -> str:
+    if client_options.batch_url is None:
+        return (
+            "/** Sends every request of the client */\n"
+            + "function sendRequest(requestPath: string, init: RequestInit): Promise<Response> {\n"
+            + "    return fetch(requestPath, init);\n"
+            + "}\n"
+        )
+    return (
+        _FETCH_BATCHED.replace("BATCH_URL", json.dumps(client_options.batch_url))
+        .replace("BATCH_HEADERS", headers)
+        .replace("BATCH_MAX_REQUESTS", str(client_options.batch_max_requests))
+        .replace(
+            "BATCH_SCHEDULE",
+            "queueMicrotask(flushBatch)"
+            if not client_options.batch_window
+            else "setTimeout(flushBatch, %s)"
+            % get_ts_milliseconds(client_options.batch_window),
+        )
+        + "\n"
+        + "/** Sends every request of the client, in batches */\n"
+        + "function sendRequest(requestPath: string, init: RequestInit): Promise<Response> {\n"
+        + "    return fetchBatched(requestPath, init);\n"
+        + "}\n"
+    )
+
+
+# the values and types of the runtime which endpoints refer to, imported by each module of a
+# client generated with `layout="directory"`
+RUNTIME_VALUES = ("request",)
+RUNTIME_TYPES = (
+    "CancelablePromise",
+    "CursorPage",
+    "GetParams",
+    "Page",
+    "RequestParams",
+    "StreamParams",
+)
+
+
+def get_runtime_text(
+    client_options: ClientOptions, cache_tags: Dict[str, List[str]], headers: str
+) -> str:
+    """Returns the TypeScript declared before the interfaces and endpoints of the client
+
+    :param dict cache_tags: The paths of the GET endpoints providing each cache tag, e.g. `{"Foo": ["foo.list"]}`
+    :param str headers: The TypeScript object literal of the headers of every request
+    """
+    return (
+        _REQUEST_CONTROLLER
+        + "\n"
+        + _get_send_request_text(client_options, headers)
+        + "\n"
+        + _FETCH_DEDUPLICATED
+        + "\n"
+        + _SEND_WITH_RETRY
+        + "\n"
+        + _READ_STREAM
+        + "\n"
+        + _ITERATE_PAGES
+        + "\n"
+        + _HASH_RESPONSE
+        + "\n"
+        + _RESPONSE_CACHE
+        + "\n"
+        + "/** The GET endpoints providing each cache tag */\n"
+        + "export const cacheTags: { [tag: string]: string[] } = %s;\n\n"
+        % json.dumps(cache_tags)
+        + "export const cache = new ResponseCache(%d, %s, cacheTags);\n\n"
+        % (
+            client_options.cache_max_entries,
+            get_ts_milliseconds(client_options.cache_ttl, default="Infinity"),
+        )
+        + _REQUEST.replace(
+            " Defaults to `DEFAULT_TIMEOUT`.",
+            ""
+            if client_options.timeout is None
+            else " Defaults to `%s`." % get_ts_milliseconds(client_options.timeout),
+        )
+        .replace("DEFAULT_TIMEOUT", get_ts_milliseconds(client_options.timeout))
+        .replace("HEADERS", headers)
+    )
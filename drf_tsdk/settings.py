@@ -0,0 +1,25 @@
+from django.conf import settings
+
+DEFAULTS = {
+    # One of "eager", "deferred", "debug" or "background". See `generate_typescript_bindings`.
+    "GENERATION_MODE": "eager",
+    "SERIALIZER_FIELD_MAPPINGS": None,
+    # If True, a fingerprint of the inputs is stored in the generated file, and generation is
+    # skipped entirely when the fingerprint is unchanged.
+    "USE_FINGERPRINT": True,
+    # If set, the rendered TypeScript of each interface and endpoint is cached in this directory,
+    # and only the ones whose serializers or views changed are rendered again.
+    "RENDER_CACHE_DIR": None,
+    # The namespaces of the `include()`d URLconfs which are never searched for endpoints
+    "EXCLUDED_URL_NAMESPACES": ["admin"],
+    # If set, each generation is profiled with cProfile, and its profile is saved in this directory
+    "PROFILE_DIR": None,
+    # If True, generations profiled in `PROFILE_DIR` also trace their memory allocations
+    "PROFILE_MEMORY": False,
+}
+
+
+def get_setting(name: str):
+    """Returns the value of `name` from the `DRF_TSDK` Django setting, falling back to the default"""
+    user_settings = getattr(settings, "DRF_TSDK", None) or {}
+    return user_settings.get(name, DEFAULTS[name])
@@ -0,0 +1,71 @@
+import json
+import logging
+from typing import Iterable, Optional, Type
+
+from django.http import StreamingHttpResponse
+
+from rest_framework import serializers
+from rest_framework.utils.encoders import JSONEncoder
+
+_logger = logging.getLogger(f"drf-tsdk.{__name__}")
+
+# the content type of each format accepted by `@ts_api_endpoint(..., stream=...)`
+STREAM_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "json-seq": "application/json-seq",
+}
+
+
+class StreamingSerializerResponse(StreamingHttpResponse):
+    """Streams `instances`, e.g. a queryset, serialized one at a time by `serializer_class`, as
+    newline-delimited JSON or as JSON text sequences (RFC 7464). Querysets are iterated in chunks
+    of `chunk_size` rows, so that neither the rows nor their representations are held in memory.
+
+        @ts_api_endpoint(path=["foo", "export"], response_serializer=FooSerializer(many=True), stream="ndjson")
+        def export(self, request):
+            return StreamingSerializerResponse(Foo.objects.all(), FooSerializer, context={"request": request})
+    """
+
+    def __init__(
+        self,
+        instances: Iterable,
+        serializer_class: Type[serializers.BaseSerializer],
+        stream_format: str = "ndjson",
+        context: Optional[dict] = None,
+        chunk_size: int = 2000,
+        **kwargs,
+    ):
+        if stream_format not in STREAM_FORMATS:
+            raise ValueError(
+                "`stream_format` must be one of %s" % ", ".join(STREAM_FORMATS)
+            )
+        kwargs.setdefault("content_type", STREAM_FORMATS[stream_format])
+        super().__init__(
+            self._get_lines(
+                instances, serializer_class, stream_format, context, chunk_size
+            ),
+            **kwargs,
+        )
+
+    @staticmethod
+    def _get_lines(instances, serializer_class, stream_format, context, chunk_size):
+        # a single serializer represents every row
+        serializer = serializer_class(context=context or {})
+        if hasattr(instances, "iterator"):
+            instances = instances.iterator(chunk_size=chunk_size)
+        # JSON text sequences prefix each item with a record separator
+        prefix = "\x1e" if stream_format == "json-seq" else ""
+        count = 0
+        for instance in instances:
+            yield (
+                prefix
+                + json.dumps(
+                    serializer.to_representation(instance),
+                    cls=JSONEncoder,
+                    ensure_ascii=False,
+                    separators=(",", ":"),
+                )
+                + "\n"
+            ).encode("utf-8")
+            count += 1
+        _logger.debug("Streamed %d items", count)
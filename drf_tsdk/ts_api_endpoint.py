@@ -6,6 +6,7 @@ from rest_framework import serializers
 
 from .drf_to_ts import DRFViewMapper
 from .exceptions import DRFTypeScriptAPIClientException
+from .streaming import STREAM_FORMATS
 
 _logger = logging.getLogger(f"drf-tsdk.{__name__}")
 
@@ -17,6 +18,15 @@ def ts_api_endpoint(
     query_serializer: Optional[Type[serializers.Serializer]] = None,
     body_serializer: Optional[Type[serializers.Serializer]] = None,
     response_serializer: Optional[Type[serializers.Serializer]] = None,
+    cache_ttl: Optional[float] = None,
+    deduplicate: Optional[bool] = None,
+    provides: Optional[List[str]] = None,
+    invalidates: Optional[List[str]] = None,
+    stale_while_revalidate: bool = False,
+    latest_wins: bool = False,
+    retry: Optional[dict] = None,
+    stream: Optional[str] = None,
+    paginated: bool = False,
 ):
     """Any Django Rest Framework view with this decorator will be added to a
     dynamically-generated TypeScript file with the approprate TypeScript type interfaces.
@@ -25,6 +35,31 @@ def ts_api_endpoint(
     @api_view(['GET'])
     def foo(request):
         pass
+
+    :param float cache_ttl: The number of seconds the responses of this GET endpoint are cached for,
+        overriding the `cache_ttl` passed to `generate_typescript_bindings`.
+    :param bool deduplicate: If `True`, concurrent identical calls to this GET endpoint share a single
+        request. Defaults to the `deduplicate_requests` passed to `generate_typescript_bindings`.
+    :param list provides: The cache tags of the responses of this GET endpoint, e.g. `["Foo"]`.
+    :param list invalidates: The cache tags whose cached responses are evicted when this endpoint
+        returns a successful response, e.g. `["Foo"]`.
+    :param bool stale_while_revalidate: The default of the `staleWhileRevalidate` parameter of this GET
+        endpoint, which calls `onSuccess` with the cached response at once, then refreshes it in the
+        background and calls `onSuccess` again only if it changed.
+    :param bool latest_wins: If `True`, a call to this endpoint cancels the previous one if it is still
+        pending, e.g. for typeahead queries.
+    :param dict retry: Overrides the retry options passed to `generate_typescript_bindings` for this
+        endpoint, with any of the keys "attempts", "backoff", "max_backoff", "jitter" and
+        "retry_after". POST and PATCH endpoints, which are not idempotent, are only retried if this is
+        set.
+    :param str stream: If "ndjson" or "json-seq", the view streams its response as newline-delimited
+        JSON or as JSON text sequences, e.g. with `drf_tsdk.streaming.StreamingSerializerResponse`, and
+        the client passes each item to `onChunk` as soon as it is received. Streamed responses are not
+        cached, deduplicated or batched.
+    :param bool paginated: If `True`, this GET endpoint paginates its `many=True` response with the
+        `pagination_class` of its view, which must derive from `PageNumberPagination`,
+        `LimitOffsetPagination` or `CursorPagination`: its response is typed as a `Page` or
+        `CursorPage` envelope, and its query accepts the paginator's parameters.
     """
     if (
         not isinstance(path, list)
@@ -86,6 +121,64 @@ def ts_api_endpoint(
             "`query_serializer` must be a Serializer or ListSerializer instance, a Serializer subclass, or None."
         )
 
+    if cache_ttl is not None:
+        if isinstance(cache_ttl, bool) or not isinstance(cache_ttl, (int, float)):
+            raise TypeError("`cache_ttl` must be a number of seconds or None.")
+        if cache_ttl < 0:
+            raise ValueError("`cache_ttl` must not be negative.")
+
+    if deduplicate is not None and not isinstance(deduplicate, bool):
+        raise TypeError("`deduplicate` must be a boolean or None.")
+
+    for name, tags in (("provides", provides), ("invalidates", invalidates)):
+        if tags is None:
+            continue
+        if not isinstance(tags, (list, tuple)) or not all(
+            isinstance(tag, str) for tag in tags
+        ):
+            raise TypeError(f"`{name}` must be a list or tuple of strings, or None.")
+
+    if not isinstance(stale_while_revalidate, bool):
+        raise TypeError("`stale_while_revalidate` must be a boolean.")
+
+    if not isinstance(latest_wins, bool):
+        raise TypeError("`latest_wins` must be a boolean.")
+
+    if retry is not None:
+        if not isinstance(retry, dict):
+            raise TypeError("`retry` must be a dictionary or None.")
+        unknown_keys = set(retry) - {
+            "attempts",
+            "backoff",
+            "max_backoff",
+            "jitter",
+            "retry_after",
+        }
+        if unknown_keys:
+            raise ValueError(
+                "Unknown `retry` options: %s" % ", ".join(sorted(unknown_keys))
+            )
+        if "attempts" in retry and (
+            not isinstance(retry["attempts"], int) or retry["attempts"] < 1
+        ):
+            raise ValueError("`retry['attempts']` must be a positive integer.")
+        for key in ("backoff", "max_backoff"):
+            if key in retry and (
+                not isinstance(retry[key], (int, float)) or retry[key] < 0
+            ):
+                raise ValueError(
+                    f"`retry['{key}']` must be a non-negative number of seconds."
+                )
+        for key in ("jitter", "retry_after"):
+            if key in retry and not isinstance(retry[key], bool):
+                raise TypeError(f"`retry['{key}']` must be a boolean.")
+
+    if stream is not None and stream not in STREAM_FORMATS:
+        raise ValueError("`stream` must be one of %s" % ", ".join(STREAM_FORMATS))
+
+    if not isinstance(paginated, bool):
+        raise TypeError("`paginated` must be a boolean.")
+
     def decorator(view):
         _logger.debug("Updating mapping for %s", view)
         if len(path) == 0:
@@ -99,6 +192,15 @@ def ts_api_endpoint(
             query_serializer=query_serializer,
             body_serializer=body_serializer,
             response_serializer=response_serializer,
+            cache_ttl=cache_ttl,
+            deduplicate=deduplicate,
+            provides=provides,
+            invalidates=invalidates,
+            stale_while_revalidate=stale_while_revalidate,
+            latest_wins=latest_wins,
+            retry=retry,
+            stream=stream,
+            paginated=paginated,
         )
         # mapper.update_mappings()
         return view
@@ -1,27 +1,66 @@
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional, Tuple
+
 from django.urls import URLPattern, URLResolver
+from django.urls.resolvers import RegexPattern
 
 from .exceptions import DRFTypeScriptAPIClientException
 
 
-class URLPattern_:
-    def __init__(self, pattern, base_url=""):
-        self.url_pattern = pattern
-        self.base_url = base_url
+class URLPattern_(NamedTuple):
+    base_url: str  # the prefixes of every enclosing `include()`, joined
+    url_pattern: URLPattern
+    # the `RoutePattern`s or `RegexPattern`s of every enclosing `include()`, outermost first
+    prefixes: Tuple = ()
 
 
-def resolve_urls(urlpatterns):
-    def list_urls(urlpatterns_, all_patterns=[], base_url=""):
-        for urlpattern in urlpatterns_:
-            if isinstance(urlpattern, URLPattern):
-                all_patterns += [URLPattern_(urlpattern, base_url)]
-            elif isinstance(urlpattern, URLResolver):
-                all_patterns += list_urls(
-                    urlpattern.url_patterns, all_patterns, base_url=urlpattern.pattern
-                )
-            else:
-                raise DRFTypeScriptAPIClientException(
-                    f"Unrecognized pattern {str(urlpattern)}"
-                )
-        return all_patterns
+def _get_prefix(pattern) -> str:
+    if isinstance(pattern, RegexPattern):
+        regex = str(pattern._regex)
+        if regex.startswith("^"):
+            regex = regex[1:]
+        if regex.endswith("$"):
+            regex = regex[:-1]
+        return regex
+    return str(pattern)
 
-    return list_urls(urlpatterns)
+
+def resolve_urls(
+    urlpatterns: Iterable,
+    should_include: Optional[Callable[[URLPattern], bool]] = None,
+    excluded_namespaces: Iterable[str] = (),
+    should_descend: Optional[Callable[[URLResolver], bool]] = None,
+) -> Iterator[URLPattern_]:
+    """Lazily yields a `(base_url, url_pattern, prefixes)` tuple for every URL pattern in
+    `urlpatterns`, depth-first and in order, where `base_url` joins the prefixes of all the
+    enclosing resolvers and `prefixes` are their patterns.
+
+    :param should_include: If provided, only patterns for which it returns `True` are yielded.
+    :param excluded_namespaces: The `include()`d subtrees with these namespaces are skipped entirely.
+    :param should_descend: If provided, the `include()`d subtrees for which it returns `False` are
+        skipped entirely, e.g. those without any pattern `should_include` would yield.
+    """
+    excluded_namespaces = set(excluded_namespaces)
+    stack = [(iter(urlpatterns), "", ())]
+    while stack:
+        _, base_url, prefixes = stack[-1]
+        urlpattern = next(stack[-1][0], None)
+        if urlpattern is None:
+            stack.pop()
+        elif isinstance(urlpattern, URLPattern):
+            if should_include is None or should_include(urlpattern):
+                yield URLPattern_(base_url, urlpattern, prefixes)
+        elif isinstance(urlpattern, URLResolver):
+            if urlpattern.namespace not in excluded_namespaces and (
+                should_descend is None or should_descend(urlpattern)
+            ):
+                stack.append(
+                    (
+                        iter(urlpattern.url_patterns),
+                        base_url + _get_prefix(urlpattern.pattern),
+                        prefixes + (urlpattern.pattern,),
+                    )
+                )
+        else:
+            raise DRFTypeScriptAPIClientException(
+                f"Unrecognized pattern {str(urlpattern)}"
+            )
@@ -1,4 +1,4 @@
-from setuptools import setup
+from setuptools import find_packages, setup
 
 NAME = "drf-tsdk"
 PACKAGE = "drf_tsdk"
@@ -26,7 +26,7 @@ setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     keywords=["Django", "Django Rest Framework", "DRF", "Typescript", "Python", "API"],
-    packages=[PACKAGE],
+    packages=find_packages(include=[PACKAGE, f"{PACKAGE}.*"]),
     include_package_data=True,
     zip_safe=False,
     platforms="any",
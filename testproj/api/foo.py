@@ -1,7 +1,9 @@
 from rest_framework import serializers
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.viewsets import ViewSet
 
 from drf_tsdk import ts_api_endpoint, ts_api_interface
+from drf_tsdk.streaming import StreamingSerializerResponse
 
 from .common import SuccessSerializer
 from .serializers import MyCustomField
@@ -62,13 +64,24 @@ class FooWriteSerializer(FooSerializer):
     pass
 
 
+class FooPagination(PageNumberPagination):
+    page_size_query_param = "page_size"
+
+
 class FooView(ViewSet):
+    pagination_class = FooPagination
+
     @ts_api_endpoint(
         path=("foo", "list"),
         description="Get a list of Foos",
         query_serializer=FooQuerySerializer,
         body_serializer=None,
         response_serializer=FooSerializer(many=True),
+        cache_ttl=60,
+        provides=["Foo"],
+        stale_while_revalidate=True,
+        latest_wins=True,
+        paginated=True,
     )
     def list(self, request):
         pass
@@ -79,6 +92,7 @@ class FooView(ViewSet):
         query_serializer=None,
         body_serializer=FooWriteSerializer,
         response_serializer=FooSerializer,
+        invalidates=["Foo"],
     )
     def create(self, request, test=None):
         pass
@@ -89,6 +103,8 @@ class FooView(ViewSet):
         query_serializer=None,
         body_serializer=None,
         response_serializer=FooSerializer,
+        deduplicate=True,
+        provides=["Foo"],
     )
     def retrieve(self, request, pk):
         pass
@@ -99,6 +115,7 @@ class FooView(ViewSet):
         query_serializer=None,
         body_serializer=FooSerializer,
         response_serializer=FooSerializer,
+        invalidates=["Foo"],
     )
     def update(self, request, pk):
         pass
@@ -109,6 +126,16 @@ class FooView(ViewSet):
         query_serializer=None,
         body_serializer=None,
         response_serializer=SuccessSerializer,
+        invalidates=["Foo"],
     )
     def destroy(self, request, pk):
         pass
+
+    @ts_api_endpoint(
+        path=("foo", "export"),
+        description="Stream every Foo",
+        response_serializer=FooSerializer(many=True),
+        stream="ndjson",
+    )
+    def export(self, request):
+        return StreamingSerializerResponse([], FooSerializer)
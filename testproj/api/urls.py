@@ -5,6 +5,7 @@ from .bar import bar
 
 urlpatterns = [
     path("foo", FooView.as_view({"get": "list", "post": "create"})),
+    path("foo/export", FooView.as_view({"get": "export"})),
     path(
         "foo/<int:pk>",
         FooView.as_view({"get": "retrieve", "post": "update", "delete": "destroy"}),
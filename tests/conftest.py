@@ -0,0 +1,20 @@
+import django
+from django.conf import settings
+
+
+def pytest_configure():
+    settings.configure(
+        SECRET_KEY="tests",
+        INSTALLED_APPS=[
+            "django.contrib.auth",
+            "django.contrib.contenttypes",
+            "rest_framework",
+        ],
+        # never migrated, so that any query fails
+        DATABASES={
+            "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}
+        },
+        USE_TZ=True,
+        DRF_TSDK={"GENERATION_MODE": "deferred"},
+    )
+    django.setup()
@@ -0,0 +1,18 @@
+// Type-checked by tests/test_typescript.py against the client generated for testproj
+import API, { iteratePages } from "./api";
+import type { IFoo, Page } from "./api";
+
+export async function listFoos(q1: string): Promise<IFoo[]> {
+    const foos: IFoo[] = [];
+    // the query of `foo.list` has a required `q1` and a numeric `q3`
+    for await (const page of iteratePages(API.foo.list, { q1, q3: 1 })) {
+        const fooPage: Page<IFoo> = page;
+        foos.push(...fooPage.results);
+    }
+    return foos;
+}
+
+export function listFoosWithoutQ1() {
+    // @ts-expect-error `q1` is required
+    return iteratePages(API.foo.list, { q3: 1 });
+}
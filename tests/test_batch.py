@@ -0,0 +1,33 @@
+from importlib import import_module
+
+from django.test import SimpleTestCase, override_settings
+
+from rest_framework.test import APIRequestFactory
+
+from drf_tsdk.batch import BatchView
+
+
+@override_settings(ROOT_URLCONF="tests.urls")
+class BatchViewTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # maps its views, as importing the URLconf does before a server handles any request
+        import_module("tests.urls")
+
+    def test_a_failing_sub_request_does_not_fail_the_batch(self):
+        request = APIRequestFactory().post(
+            "/batch",
+            [{"path": "/items/1"}, {"path": "/items/fail"}, {"path": "/items/2"}],
+            format="json",
+        )
+        with self.assertLogs("drf-tsdk.drf_tsdk.batch", "ERROR"):
+            response = BatchView.as_view()(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [sub_response["status"] for sub_response in response.data],
+            [200, 500, 200],
+        )
+        self.assertEqual(
+            response.data[1]["body"], {"detail": "A server error occurred."}
+        )
@@ -0,0 +1,39 @@
+import os
+import tempfile
+from importlib import import_module
+from io import StringIO
+from unittest import TestCase
+
+from django.core.management import call_command
+
+from drf_tsdk.management.commands.generate_api_client import Command
+
+
+class GenerateApiClientTests(TestCase):
+    def _generate(self, stdout):
+        with tempfile.TemporaryDirectory() as output_dir:
+            output_path = os.path.join(output_dir, "api.ts")
+            call_command(
+                Command(),
+                "--urlconf",
+                "tests.urls",
+                "--output",
+                output_path,
+                "--force",
+                stdout=stdout,
+            )
+            self.assertTrue(os.path.exists(output_path))
+
+    def test_summary_includes_serializer_introspection(self):
+        stdout = StringIO()
+        self._generate(stdout)
+        self.assertRegex(
+            stdout.getvalue(),
+            r"resolved URLs in [\d.]+ms, mapped views in [\d.]+ms, built interfaces and "
+            r"rendered in [\d.]+ms, of which [\d.]+ms introspecting serializers",
+        )
+
+    def test_urlconf_defining_views_may_be_imported_already(self):
+        import_module("tests.urls")
+        self._generate(StringIO())
+        self._generate(StringIO())
@@ -0,0 +1,39 @@
+from django.contrib.auth.models import Group
+from django.test import TestCase
+
+from rest_framework import serializers
+
+from drf_tsdk.fingerprint import InputFingerprinter
+
+
+class GroupMembershipSerializer(serializers.Serializer):
+    group = serializers.PrimaryKeyRelatedField(queryset=Group.objects.all())
+
+
+class DescribeTests(TestCase):
+    def test_queryset_is_not_evaluated(self):
+        with self.assertNumQueries(0):
+            description = InputFingerprinter().describe_field(
+                serializers.PrimaryKeyRelatedField(queryset=Group.objects.all())
+            )
+        self.assertIn("django.contrib.auth.models.Group", description)
+
+    def test_serializer_with_queryset_is_not_evaluated(self):
+        with self.assertNumQueries(0):
+            InputFingerprinter().describe_serializer_class(GroupMembershipSerializer)
+
+    def test_manager_is_described_by_its_model(self):
+        self.assertEqual(
+            InputFingerprinter().describe(Group.objects),
+            "django.contrib.auth.models.GroupManager(django.contrib.auth.models.Group)",
+        )
+
+    def test_objects_are_described_by_their_type(self):
+        class Opaque:
+            pass
+
+        self.assertEqual(
+            InputFingerprinter().describe(Opaque()),
+            InputFingerprinter().describe(Opaque()),
+        )
+        self.assertNotIn("0x", InputFingerprinter().describe(Opaque()))
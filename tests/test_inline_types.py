@@ -0,0 +1,40 @@
+from unittest import TestCase
+
+from drf_tsdk.inline_types import InlineTypeAliases, mark_inline_type
+
+
+class InlineTypeAliasesTests(TestCase):
+    def test_identical_types_of_different_serializers_share_an_alias(self):
+        fragments = [
+            mark_inline_type("FooWriteSerializer", "write", "{a: string}"),
+            mark_inline_type("FooSerializer", "write", "{a: string}"),
+        ]
+        aliases = InlineTypeAliases(fragments)
+        self.assertEqual(
+            [aliases.resolve(fragment) for fragment in fragments],
+            ["_FooWriteSerializerWrite", "_FooWriteSerializerWrite"],
+        )
+        self.assertEqual(
+            aliases.get_declarations_text(),
+            "type _FooWriteSerializerWrite = {a: string};",
+        )
+
+    def test_types_used_for_both_methods_have_no_suffix(self):
+        fragments = [
+            mark_inline_type("InnerSerializer", "read", "{a: string}"),
+            mark_inline_type("InnerSerializer", "write", "{a: string}"),
+        ]
+        aliases = InlineTypeAliases(fragments)
+        self.assertEqual(aliases.resolve(fragments[0]), "_InnerSerializer")
+
+    def test_types_used_once_are_inlined(self):
+        fragments = [
+            mark_inline_type("FooSerializer", "read", "{a: string}"),
+            mark_inline_type("BarSerializer", "read", "{b: number}"),
+        ]
+        aliases = InlineTypeAliases(fragments)
+        self.assertEqual(
+            [aliases.resolve(fragment) for fragment in fragments],
+            ["{a: string}", "{b: number}"],
+        )
+        self.assertEqual(aliases.aliases, {})
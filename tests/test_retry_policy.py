@@ -0,0 +1,21 @@
+from unittest import TestCase
+
+from drf_tsdk.generate_typescript_bindings import _get_retry_policy
+from drf_tsdk.runtime import ClientOptions
+
+
+class RetryPolicyTests(TestCase):
+    def test_max_backoff_defaults_to_the_client_options(self):
+        self.assertEqual(
+            _get_retry_policy("GET", None, ClientOptions(retry_attempts=3)),
+            "{ attempts: 3, backoff: 500, maxBackoff: 30000, jitter: true, "
+            "retryAfter: true }",
+        )
+
+    def test_endpoints_override_max_backoff(self):
+        self.assertIn(
+            "maxBackoff: 2000",
+            _get_retry_policy(
+                "POST", {"attempts": 2, "max_backoff": 2}, ClientOptions()
+            ),
+        )
@@ -0,0 +1,67 @@
+from unittest import TestCase
+
+from django.http import HttpResponse
+from django.urls import include, path, re_path
+
+from drf_tsdk.route_translator import translate_url
+from drf_tsdk.url_resolver import resolve_urls
+
+
+def view(request, *args, **kwargs):
+    return HttpResponse()
+
+
+def translate(urlpatterns):
+    return [
+        translate_url(prefixes, url_pattern.pattern)
+        for _, url_pattern, prefixes in resolve_urls(urlpatterns)
+    ]
+
+
+class PrefixTests(TestCase):
+    def test_route_prefixes_are_not_regexes(self):
+        for prefix in ("c++/", "x.y(z)/", "what?/", "a.b/"):
+            with self.subTest(prefix=prefix):
+                self.assertEqual(
+                    translate([path(prefix, include([path("a/", view)]))]),
+                    [(f'"/{prefix}a/"', [])],
+                )
+
+    def test_route_prefix_parameters(self):
+        self.assertEqual(
+            translate([path("c++/<int:pk>/", include([path("a/", view)]))]),
+            [("`/c++/${pk}/a/`", ["pk"])],
+        )
+
+    def test_regex_prefixes(self):
+        self.assertEqual(
+            translate(
+                [
+                    re_path(
+                        r"^r/(?P<slug>[-\w]+)/",
+                        include([path("x.y/<int:pk>", view)]),
+                    )
+                ]
+            ),
+            [("`/r/${slug}/x.y/${pk}`", ["slug", "pk"])],
+        )
+
+
+class RegexTests(TestCase):
+    def test_optional_groups_are_dropped(self):
+        self.assertEqual(
+            translate([re_path(r"^z/(\d+)/(?:page/(?P<page>\d+)/)?$", view)]),
+            [("`/z/${arg0}/`", ["arg0"])],
+        )
+
+    def test_optional_capturing_groups_are_dropped(self):
+        self.assertEqual(
+            translate([re_path(r"^z/(?P<pk>\d+)/(?P<format>\.json)?$", view)]),
+            [("`/z/${pk}/`", ["pk"])],
+        )
+
+    def test_non_capturing_groups_are_kept(self):
+        self.assertEqual(
+            translate([re_path(r"^z/(?:page/(?P<page>\d+)/)$", view)]),
+            [("`/z/page/${page}/`", ["page"])],
+        )
@@ -0,0 +1,59 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from unittest import TestCase, skipUnless
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+_GENERATE_TESTPROJ_CLIENT = """
+import os, sys, django
+from django.core.management import call_command
+os.environ["DJANGO_SETTINGS_MODULE"] = "testproj.settings"
+django.setup()
+from drf_tsdk.management.commands.generate_api_client import Command
+call_command(Command(), "--output", sys.argv[1], "--force")
+"""
+
+
+@skipUnless(shutil.which("tsc"), "tsc is not installed")
+class TypeScriptFixtureTests(TestCase):
+    def test_iterate_pages_infers_the_query_of_the_endpoint(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            # testproj has its own settings, so its client is generated in another process
+            subprocess.run(
+                [
+                    sys.executable,
+                    "-c",
+                    _GENERATE_TESTPROJ_CLIENT,
+                    os.path.join(output_dir, "api.ts"),
+                ],
+                cwd=os.path.join(_ROOT, "testproj"),
+                env=dict(os.environ, PYTHONPATH=_ROOT),
+                check=True,
+            )
+            fixture_path = shutil.copy(
+                os.path.join(_FIXTURES, "iterate_pages.ts"), output_dir
+            )
+            result = subprocess.run(
+                [
+                    "tsc",
+                    "--noEmit",
+                    "--strict",
+                    "--target",
+                    "es2022",
+                    "--module",
+                    "es2022",
+                    "--moduleResolution",
+                    "node",
+                    "--lib",
+                    "es2022,dom",
+                    fixture_path,
+                ],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                universal_newlines=True,
+            )
+            self.assertEqual(result.returncode, 0, result.stdout)
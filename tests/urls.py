@@ -0,0 +1,29 @@
+from django.urls import path
+
+from rest_framework import serializers
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+
+from drf_tsdk import ts_api_endpoint
+
+
+class ItemSerializer(serializers.Serializer):
+    name = serializers.CharField()
+
+
+@ts_api_endpoint(path=["items", "get"], response_serializer=ItemSerializer)
+@api_view(["GET"])
+def get_item(request, pk):
+    return Response({"name": "item"})
+
+
+@ts_api_endpoint(path=["items", "fail"])
+@api_view(["GET"])
+def fail(request):
+    raise RuntimeError("fail")
+
+
+urlpatterns = [
+    path("items/<int:pk>", get_item),
+    path("items/fail", fail),
+]